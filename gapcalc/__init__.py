@@ -0,0 +1,38 @@
+"""
+Python compute engine for the D.OS gap-closure planner.
+
+Importing the package is cheap: the public names below are resolved on first
+use, so `from gapcalc import compute_plan` loads only the pure-Python plan
+module, and NumPy is imported only by the engines that need it.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "IncrementalPlanner": "incremental",
+    "compute_plan": "plan",
+    "compute_plan_batch": "plan_batch",
+    "find_best_mix": "racing",
+    "funnel_simulation": "funnel",
+    "k_tier_mix": "ktier",
+    "project_arr": "cohort",
+    "refine_tier_mix": "refine",
+    "render_planner": "render",
+    "tier_mix_curves": "curves",
+    "tier_mix_monte_carlo": "tier_mix",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,271 @@
+# Benchmarks for the plan and tier-mix engines.
+#
+#   python -m gapcalc.bench [--quick] [--only SUBSTR] [--out results.json]
+#                           [--baseline baseline.json] [--threshold 1.5]
+#
+# Cases: scalar vs batched computePlan, the MC engine over N_new x iterations,
+# exact, adaptive and normal modes over N_new, the joint funnel x tier mode over
+# ICP_2026, K-tier cost vs grid step, the cohort ARR projection over scenario
+# counts, and parallel scaling over worker counts. Each case reports the median and min wall
+# time of a few repeats plus a throughput figure. --out writes the results as
+# JSON; --baseline compares medians against an earlier --out file and exits 1
+# when any case is more than `threshold` times slower.
+#
+# The "accuracy/samplers" check also measures each mode="mc" sampler's RMS error
+# against mode="exact" over fixed seeds (so a tree gives the same verdict on
+# every run), and exits 1 if a quasi-Monte Carlo sampler's error is more than
+# QMC_SLACK times the pseudo-random one's. The "limits/wins_pmf" check times
+# funnel.wins_pmf() at large ICP_2026 under tracemalloc and exits 1 past
+# WINS_PMF_MAX_S seconds or WINS_PMF_MAX_MB of peak memory.
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from .cache import ENGINE_VERSION
+from .cohort import project_arr
+from .defaults import DEFAULTS
+from .funnel import wins_pmf
+from .ktier import k_tier_mix
+from .plan import compute_plan
+from .plan_batch import compute_plan_batch
+from .tier_mix import SAMPLERS, grid_cells, simplex_axis, tier_inputs, tier_mix_monte_carlo
+
+N_NEW = (5, 20, 50, 100, 200, 500)
+ITERATIONS = (500, 5000)
+WORKERS = (1, 2, 4, 8)
+K_STEPS = (0.1, 0.05, 0.025)
+JOINT_ICP = (300, 1000, 5000)
+COHORT_SCENARIOS = (1000, 10000)
+SAMPLER_N_NEW = (20, 100, 500)
+SAMPLER_ITERATIONS = 512
+SAMPLER_SEEDS = 3
+QMC_SAMPLERS = ("halton", "sobol")
+QMC_SLACK = 1.25  # allowed QMC / pseudo error ratio before qmc_worse() flags it
+LIMIT_ICP = (20000, 50000)
+WINS_PMF_MAX_S = 10.0
+WINS_PMF_MAX_MB = 512
+
+
+def plan_for(N_new, p=DEFAULTS):
+    """compute_plan(p) with required_new_customers forced to N_new (gap scaled to match)."""
+    plan = dict(compute_plan(p))
+    plan["required_new_customers"] = float(N_new)
+    plan["gap_mrr"] = N_new * plan["avg_new_mrpu"]
+    return plan
+
+
+def time_call(fn, repeats=3, warmup=1):
+    """(median, min) wall seconds of fn() over `repeats` runs after `warmup` untimed ones."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times)), float(min(times))
+
+
+def cases(quick=False):
+    """Yield (name, params, fn, throughput) where throughput(seconds) -> {unit: rate}."""
+    n_cells = sum(1 for _ in grid_cells(simplex_axis(), simplex_axis()))
+    n_rows = 2000 if quick else 20000
+    rng = np.random.default_rng(0)
+    cols = {k: np.full(n_rows, float(v)) for k, v in DEFAULTS.items()}
+    cols["ICP_2026"] = rng.integers(200, 800, n_rows).astype(float)
+    rows = [{k: float(v[n]) for k, v in cols.items()} for n in range(n_rows)]
+    yield ("plan/scalar", {"rows": n_rows}, lambda: [compute_plan(r) for r in rows],
+           lambda s: {"plans_per_s": n_rows / s})
+    yield ("plan/batch", {"rows": n_rows}, lambda: compute_plan_batch(cols),
+           lambda s: {"plans_per_s": n_rows / s})
+
+    n_news = N_NEW[:4] if quick else N_NEW
+    for iters in ITERATIONS[:1] if quick else ITERATIONS:
+        p = dict(DEFAULTS, mc_tier_iterations=iters)
+        for N_new in n_news:
+            plan = plan_for(N_new, p)
+            draws = n_cells * iters * N_new
+            yield ("tier_mix/mc/N%d/it%d" % (N_new, iters), {"N_new": N_new, "iterations": iters},
+                   lambda p=p, plan=plan: tier_mix_monte_carlo(p, plan, seed=1),
+                   lambda s, draws=draws: {"cells_per_s": n_cells / s, "draws_per_s": draws / s})
+
+    for mode in ("exact", "adaptive", "normal"):
+        for N_new in n_news:
+            plan = plan_for(N_new)
+            yield ("tier_mix/%s/N%d" % (mode, N_new), {"N_new": N_new},
+                   lambda plan=plan, mode=mode: tier_mix_monte_carlo(DEFAULTS, plan, seed=1, mode=mode),
+                   lambda s: {"cells_per_s": n_cells / s})
+
+    for icp in JOINT_ICP[:2] if quick else JOINT_ICP:
+        p = dict(DEFAULTS, ICP_2026=icp)
+        plan = compute_plan(p)
+        yield ("tier_mix/joint/ICP%d" % icp, {"ICP_2026": icp},
+               lambda p=p, plan=plan: tier_mix_monte_carlo(p, plan, mode="joint"),
+               lambda s: {"cells_per_s": n_cells / s})
+
+    for step in K_STEPS[:2] if quick else K_STEPS:
+        m = round(1 / step)
+        k_cells = (m + 1) * (m + 2) // 2
+        yield ("ktier/step%g" % step, {"step": step, "cells": k_cells},
+               lambda step=step: k_tier_mix(DEFAULTS, plan_for(50), step=step, iterations=1000, seed=1),
+               lambda s, n=k_cells: {"cells_per_s": n / s})
+
+    for n_scen in COHORT_SCENARIOS[:1] if quick else COHORT_SCENARIOS:
+        yield ("cohort/S%d/y5" % n_scen, {"scenarios": n_scen, "years": 5},
+               lambda n_scen=n_scen: project_arr(DEFAULTS, years=5, scenarios=n_scen, wins="poisson", seed=1),
+               lambda s, n_scen=n_scen: {"scenarios_per_s": n_scen / s})
+
+    # Big enough that the pool start-up does not dominate
+    p = dict(DEFAULTS, mc_tier_iterations=2000 if quick else 10000)
+    plan = plan_for(100, p)
+    for workers in WORKERS:
+        if workers > (os.cpu_count() or 1) * 2:
+            continue
+        yield ("parallel/workers%d" % workers, {"workers": workers, "N_new": 100,
+                                                "iterations": tier_inputs(p, plan)[4]},
+               lambda workers=workers: tier_mix_monte_carlo(p, plan, seed=1, workers=workers),
+               lambda s: {"cells_per_s": n_cells / s})
+
+
+def sampler_accuracy(quick=False, log=print):
+    """
+    {"N<n>": {sampler: RMS error}} of each sampler's prob_gap heatmap against
+    mode="exact", averaged over SAMPLER_SEEDS seeds at SAMPLER_ITERATIONS draws
+    per cell with seeds 1..SAMPLER_SEEDS, so repeated runs give the same errors.
+    Samplers whose dependencies are missing (sobol: scipy) are skipped.
+    """
+    out = {}
+    p = dict(DEFAULTS, mc_tier_iterations=SAMPLER_ITERATIONS)
+    for N_new in SAMPLER_N_NEW[:2] if quick else SAMPLER_N_NEW:
+        plan = plan_for(N_new, p)
+        exact = tier_mix_monte_carlo(p, plan, mode="exact")["heatmap"]["z"]
+        errors = {}
+        for sampler in SAMPLERS:
+            try:
+                errors[sampler] = float(np.mean([
+                    np.sqrt(np.nanmean((tier_mix_monte_carlo(p, plan, seed=seed, sampler=sampler)
+                                        ["heatmap"]["z"] - exact) ** 2))
+                    for seed in range(1, SAMPLER_SEEDS + 1)]))
+            except ImportError:
+                continue
+        out["N%d" % N_new] = errors
+        log("%-28s %s" % ("accuracy/samplers/N%d" % N_new, "  ".join(
+            "%s=%.4g" % kv for kv in errors.items())))
+    return out
+
+
+def qmc_worse(accuracy):
+    """[(case, sampler, error, pseudo error)] where a QMC sampler's error exceeds pseudo's by QMC_SLACK."""
+    return [(case, s, errors[s], errors["pseudo"])
+            for case, errors in accuracy.items()
+            for s in QMC_SAMPLERS if s in errors and errors[s] > QMC_SLACK * errors["pseudo"]]
+
+
+def wins_pmf_limits(quick=False, log=print):
+    """{"ICP<n>": {seconds, peak_mb}} of one wins_pmf(rates="proposed") call per LIMIT_ICP size."""
+    out = {}
+    for icp in LIMIT_ICP[:1] if quick else LIMIT_ICP:
+        p = dict(DEFAULTS, ICP_2026=icp)
+        plan = compute_plan(p)
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        wins_pmf(p, plan, rates="proposed")
+        seconds = time.perf_counter() - t0
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+        out["ICP%d" % icp] = {"seconds": seconds, "peak_mb": peak_mb}
+        log("%-28s %10.4f s  peak_mb=%.4g" % ("limits/wins_pmf/ICP%d" % icp, seconds, peak_mb))
+    return out
+
+
+def over_limits(limits):
+    """[(case, seconds, peak_mb)] for wins_pmf_limits() entries past WINS_PMF_MAX_S or WINS_PMF_MAX_MB."""
+    return [(case, v["seconds"], v["peak_mb"]) for case, v in limits.items()
+            if v["seconds"] > WINS_PMF_MAX_S or v["peak_mb"] > WINS_PMF_MAX_MB]
+
+
+def run(quick=False, only=None, repeats=3, log=print):
+    """Run every case whose name contains `only`; returns the JSON-able results document."""
+    results = {}
+    for name, params, fn, throughput in cases(quick):
+        if only and only not in name:
+            continue
+        median, best = time_call(fn, repeats=1 if name.startswith("parallel/") else repeats)
+        results[name] = dict(params=params, median_s=median, min_s=best, **throughput(median))
+        log("%-28s %10.4f s  %s" % (name, median, "  ".join(
+            "%s=%.4g" % kv for kv in throughput(median).items())))
+    return {
+        "meta": {
+            "engine_version": ENGINE_VERSION,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "quick": quick,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+        "accuracy": sampler_accuracy(quick, log) if not only or only in "accuracy/samplers" else {},
+        "limits": wins_pmf_limits(quick, log) if not only or only in "limits/wins_pmf" else {},
+    }
+
+
+def compare(current, baseline, threshold=1.5):
+    """[(name, baseline_s, current_s, ratio, regressed)] for cases present in both runs."""
+    out = []
+    for name, cur in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = cur["median_s"] / base["median_s"] if base["median_s"] > 0 else float("inf")
+        out.append((name, base["median_s"], cur["median_s"], ratio, ratio > threshold))
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gapcalc.bench",
+                                     description="Benchmark the plan and tier-mix engines.")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a fast smoke run")
+    parser.add_argument("--only", default=None, help="run only cases whose name contains this")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--out", default=None, help="write results JSON here")
+    parser.add_argument("--baseline", default=None, help="results JSON from an earlier --out")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="slowdown ratio that counts as a regression (default 1.5)")
+    args = parser.parse_args(argv)
+
+    current = run(quick=args.quick, only=args.only, repeats=args.repeats)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print("Wrote:", os.path.abspath(args.out))
+    worse = qmc_worse(current["accuracy"])
+    for case, sampler, err, pseudo_err in worse:
+        print("%s: %s RMS error %.4g is over %gx pseudo %.4g" % (case, sampler, err, QMC_SLACK, pseudo_err))
+    over = over_limits(current["limits"])
+    for case, seconds, peak_mb in over:
+        print("%s: wins_pmf took %.1f s and peaked at %.0f MB (limits %.0f s, %d MB)" % (
+            case, seconds, peak_mb, WINS_PMF_MAX_S, WINS_PMF_MAX_MB))
+    if not args.baseline:
+        return 1 if worse or over else 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(current, baseline, args.threshold)
+    print("\n%-28s %10s %10s %7s" % ("case", "baseline", "current", "ratio"))
+    for name, base_s, cur_s, ratio, regressed in rows:
+        print("%-28s %10.4f %10.4f %6.2fx%s" % (name, base_s, cur_s, ratio, "  REGRESSION" if regressed else ""))
+    n_bad = sum(r[4] for r in rows)
+    print("%d of %d cases slower than %.2fx baseline" % (n_bad, len(rows), args.threshold))
+    return 1 if n_bad or worse or over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+# Two-tier result cache for the plan and tier-mix engines: an in-process LRU in
+# front of an optional size-bounded directory of pickles. The directory can be
+# shared by several script runs and sweep workers; entries are written via temp
+# file + rename, and the least recently used files are evicted past max_bytes.
+#
+# Keys are SHA-256 hashes of the canonical inputs each engine actually reads, plus
+# ENGINE_VERSION and the seed. Two parameter dicts that differ only in unrelated
+# keys (e.g. gm_2025 for the tier mix) therefore share an entry. Bump
+# ENGINE_VERSION whenever an engine's numbers change.
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+
+from .defaults import PLAN_FALLBACKS
+from .incremental import JOINT_PLAN_KEYS, PLAN_INPUTS
+from .plan import compute_plan, safe_float
+from .tier_mix import tier_inputs, tier_mix_monte_carlo
+
+ENGINE_VERSION = "2"
+
+
+def canonical_key(kind, fields, seed=None):
+    """Stable hash of `fields` (floats normalized, keys sorted) for one engine `kind`."""
+    def norm(v):
+        if isinstance(v, (list, tuple)):
+            return [norm(x) for x in v]
+        if isinstance(v, (bool, str)) or v is None:
+            return v
+        return repr(float(v))
+
+    payload = {"kind": kind, "version": ENGINE_VERSION, "seed": seed,
+               "fields": {k: norm(v) for k, v in fields.items()}}
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    In-memory LRU (max_entries) plus optional on-disk tier under `path`
+    (max_bytes total). Use plan() / tier_mix() in place of the engine calls;
+    stats() reports memory hits, disk hits, misses and uncacheable calls.
+    """
+
+    def __init__(self, path=None, max_entries=256, max_bytes=256 * 2 ** 20):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._mem = OrderedDict()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "uncached": 0}
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def stats(self):
+        return dict(self.counters, memory_entries=len(self._mem))
+
+    def _file(self, key):
+        return os.path.join(self.path, key + ".pkl")
+
+    def get(self, key):
+        if key in self._mem:
+            self._mem.move_to_end(key)
+            self.counters["memory_hits"] += 1
+            return copy.deepcopy(self._mem[key])
+        if self.path:
+            try:
+                with open(self._file(key), "rb") as f:
+                    value = pickle.load(f)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                value = None
+            if value is not None:
+                try:
+                    os.utime(self._file(key))  # mark as recently used for eviction
+                except OSError:  # evicted by another process since the load
+                    value = None
+            if value is not None:
+                self.counters["disk_hits"] += 1
+                self._remember(key, value)
+                return copy.deepcopy(value)
+        self.counters["misses"] += 1
+        return None
+
+    def put(self, key, value):
+        self._remember(key, copy.deepcopy(value))
+        if self.path:
+            tmp = self._file(key) + ".%d.tmp" % os.getpid()
+            with open(tmp, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self._file(key))
+            self._evict_disk()
+
+    def _remember(self, key, value):
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith(".pkl"):
+                try:
+                    st = os.stat(os.path.join(self.path, name))
+                except OSError:
+                    continue  # removed by another process
+                entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+            total -= size
+
+    def plan(self, p):
+        # Normalized the way compute_plan() reads them, so inputs it treats alike share an entry
+        key = canonical_key("plan", {k: safe_float(p.get(k), PLAN_FALLBACKS.get(k, 0)) for k in PLAN_INPUTS})
+        value = self.get(key)
+        if value is None:
+            value = compute_plan(p)
+            self.put(key, value)
+        return value
+
+    def tier_mix_key(self, p, plan, seed=None, **kwargs):
+        """Cache key for tier_mix(p, plan, seed, **kwargs), or None if the run is unseeded random."""
+        mode = kwargs.get("mode", "mc")
+        deterministic = mode in ("exact", "joint")
+        if seed is None and not deterministic:
+            return None
+        N_new, tiers, gap_mrr, tol, iters = tier_inputs(p, plan)
+        fields = {"N_new": N_new, "tiers": list(tiers), "gap_mrr": gap_mrr, "tol": tol}
+        if not deterministic:
+            fields["iters"] = iters
+        fields.update((k, v) for k, v in kwargs.items() if k not in ("workers", "mrpu"))
+        if kwargs.get("mrpu") is not None:
+            fields["mrpu"] = [None if s is None else s.digest() for s in kwargs["mrpu"]]
+        if mode == "joint":
+            # The inputs of funnel.wins_pmf, not its output: hashing is cheap, the PMF is not
+            fields["wins"] = [plan[k] for k in JOINT_PLAN_KEYS]
+            fields["funnel_rate_uncertainty"] = safe_float(p.get("funnel_rate_uncertainty"), 0)
+        return canonical_key("tier_mix", fields, None if deterministic else seed)
+
+    def tier_mix(self, p, plan=None, seed=None, **kwargs):
+        """tier_mix_monte_carlo(p, plan, seed, **kwargs), cached unless it would be unseeded random."""
+        plan = self.plan(p) if plan is None else plan
+        key = self.tier_mix_key(p, plan, seed, **kwargs)
+        if key is None:
+            self.counters["uncached"] += 1
+            return tier_mix_monte_carlo(p, plan, seed=seed, **kwargs)
+        value = self.get(key)
+        if value is None:
+            value = tier_mix_monte_carlo(p, plan, seed=seed, **kwargs)
+            self.put(key, value)
+        return value
@@ -0,0 +1,147 @@
+# Multi-year ARR projection from monthly cohorts. The plan only looks at 2026
+# (additional_mrr_ndr_new = new MRR x (NDR - 1), nothing carried forward); this
+# rolls the book forward month by month over `years`:
+#
+#   res = project_arr(DEFAULTS, years=5)                        # 2026-2030
+#   res = project_arr({"ndr_target": np.linspace(1.0, 1.3, 10000)})
+#   res = project_arr(DEFAULTS, scenarios=10000, wins="poisson", seed=1)
+#
+#   python -m gapcalc.cohort [--years 5] [--start-year 2026] [--wins-growth 0.1]
+#                            [--scenarios 10000 --seed 1]
+#
+# Every month each cohort loses 1 / lifetime_months of its customers (and their
+# MRR), while surviving customers' MRR compounds at ndr_target^(1/12). The 2025
+# book (exit_arr_2025, customers_present_2025) is cohort 0; new wins arrive
+# evenly through each year at avg_new_mrpu, expected_wins_2026_proposed of them
+# in the first year, growing by `wins_growth` a year after that.
+#
+# Inputs are columns as in compute_plan_batch, so each scenario is one element
+# of the broadcast shape, and all scenarios advance together one month per step.
+# Columns missing from `cols` take their DEFAULTS value.
+# Monthly cohorts of the same year age identically from then on, so the stored
+# cohort x month matrix keeps one row per acquisition year: (scenarios, years + 1,
+# months), 29 MB for 10k scenarios over 5 years.
+
+import argparse
+import sys
+
+import numpy as np
+
+from .defaults import DEFAULTS
+from .plan_batch import as_columns, compute_plan_batch, safe_column
+from .timing import stage
+
+WINS = ("expected", "poisson")
+
+
+def project_arr(cols=None, years=5, start_year=2026, wins_growth=0.0, scenarios=None,
+                wins="expected", seed=None):
+    """
+    Month-by-month ARR projection for every scenario in `cols` (DEFAULTS for any
+    input it does not give).
+
+    scenarios=N broadcasts the inputs to N scenarios. wins="poisson" draws each
+    month's new wins per scenario (seeded by `seed`) instead of using the
+    expected number. With S the broadcast shape and T = 12 x years, returns:
+
+      years           [start_year, ...]
+      mrr, customers  S + (T,)   at each month end
+      cohort_mrr      S + (years + 1, T)   row 0 = the 2025 book, row y = wins of year y
+      exit_arr        S + (years,)   ARR at each December
+      new_arr, expansion_arr, churned_arr   S + (years,)   the annual ARR bridge:
+                      exit_arr[y] = exit_arr[y - 1] + new + expansion - churned
+    """
+    if wins not in WINS:
+        raise ValueError("unknown wins %r (expected one of %s)" % (wins, ", ".join(WINS)))
+    c = dict(DEFAULTS, **as_columns({} if cols is None else cols))
+    plan = compute_plan_batch(c)
+    book_mrr = safe_column(c, "exit_arr_2025", 0) / 12.0
+    book_customers = np.maximum(0, safe_column(c, "customers_present_2025", 0))
+    mrpu = np.where(np.isfinite(plan["avg_new_mrpu"]), plan["avg_new_mrpu"], 0.0)
+    wins0 = plan["expected_wins_2026_proposed"]
+    lifetime = plan["lifetime_months"]
+    ndr = plan["ndr_target"]
+
+    shape = np.broadcast_shapes(np.shape(book_mrr), np.shape(book_customers), np.shape(mrpu))
+    if scenarios is not None:
+        shape = np.broadcast_shapes(shape, (scenarios,))
+    book_mrr, book_customers, mrpu, wins0, lifetime, ndr = (
+        np.broadcast_to(a, shape).astype(float)
+        for a in (book_mrr, book_customers, mrpu, wins0, lifetime, ndr))
+
+    months = 12 * years
+    # Monthly logo churn; a lifetime of 0 months (or less) keeps no customer for a month
+    churn = np.where(lifetime > 0, 1.0 / np.maximum(lifetime, 1.0), 1.0)
+    growth = np.power(ndr, 1.0 / 12.0)  # monthly MRR growth of surviving customers
+    rate = wins0[..., None] * (1.0 + wins_growth) ** (np.arange(months) // 12) / 12.0
+    if wins == "poisson":
+        new = np.random.default_rng(seed).poisson(np.where(np.isfinite(rate), rate, 0.0)).astype(float)
+    else:
+        new = np.where(np.isfinite(rate), rate, 0.0)
+
+    cohort_mrr = np.zeros(shape + (years + 1, months))
+    customers = np.zeros(shape + (months,))
+    bridge = {k: np.zeros(shape + (years,)) for k in ("new", "expansion", "churned")}
+    state = np.zeros(shape + (years + 1,))
+    state[..., 0] = book_mrr
+    n_cust = book_customers.copy()
+    keep, grow = (1.0 - churn)[..., None], growth[..., None]
+
+    with stage("project_arr", scenarios=int(np.prod(shape)), months=months):
+        for t in range(months):
+            y = t // 12
+            churned = state * (1.0 - keep)
+            expansion = (state - churned) * (grow - 1.0)
+            state = state - churned + expansion
+            added = new[..., t] * mrpu
+            state[..., y + 1] += added
+            n_cust = n_cust * (1.0 - churn) + new[..., t]
+            cohort_mrr[..., t] = state
+            customers[..., t] = n_cust
+            bridge["new"][..., y] += 12.0 * added
+            bridge["expansion"][..., y] += 12.0 * expansion.sum(axis=-1)
+            bridge["churned"][..., y] += 12.0 * churned.sum(axis=-1)
+
+    mrr = cohort_mrr.sum(axis=-2)
+    return {
+        "years": list(range(start_year, start_year + years)),
+        "mrr": mrr,
+        "customers": customers,
+        "cohort_mrr": cohort_mrr,
+        "exit_arr": 12.0 * mrr[..., 11::12],
+        "new_arr": bridge["new"],
+        "expansion_arr": bridge["expansion"],
+        "churned_arr": bridge["churned"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gapcalc.cohort",
+                                     description="Project ARR from monthly cohorts over several years.")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--start-year", type=int, default=2026)
+    parser.add_argument("--wins-growth", type=float, default=0.0,
+                        help="annual growth of new wins after the first year (0.1 = +10%%)")
+    parser.add_argument("--scenarios", type=int, default=None,
+                        help="draw this many scenarios with Poisson monthly wins")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    res = project_arr(DEFAULTS, args.years, args.start_year, args.wins_growth, args.scenarios,
+                      wins="poisson" if args.scenarios else "expected", seed=args.seed)
+    exit_arr = np.atleast_2d(res["exit_arr"])
+    cols = ("new_arr", "expansion_arr", "churned_arr")
+    print("%-6s %14s %14s %14s %14s %14s %14s" % (
+        "year", "exit ARR", "p10", "p90", "new", "expansion", "churned"))
+    for y, year in enumerate(res["years"]):
+        arr = exit_arr[:, y]
+        print("%-6d %14.0f %14.0f %14.0f %14.0f %14.0f %14.0f" % (
+            (year, arr.mean(), np.quantile(arr, 0.1), np.quantile(arr, 0.9))
+            + tuple(np.atleast_2d(res[k])[:, y].mean() for k in cols)))
+    target = DEFAULTS["target_exit_arr_2026"]
+    print("P(%d exit ARR >= target %.0f) = %.3f" % (res["years"][0], target, (exit_arr[:, 0] >= target).mean()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# P(close) for many tolerances and target ARRs from one pass over the grid.
+# For a fixed N_new and mix, the distribution of simulated new MRR does not
+# depend on the tolerance or the target. Each cell therefore keeps its sorted
+# sample totals (mode="mc") or the exact CDF over the count lattice
+# (mode="exact"), and every (target, tolerance) band becomes two binary searches.
+
+import numpy as np
+
+from .plan import safe_float
+from .tier_mix import (cell_rng, count_lattice, grid_cells, lattice_pmf, recommend,
+                       simplex_axis, tier_inputs)
+
+
+def _band_probs(sorted_totals, cdf, lo, hi):
+    # P(lo <= T <= hi) for every (lo, hi) pair; cdf[k] = P(T <= sorted_totals[k])
+    cdf0 = np.concatenate([[0.0], cdf])
+    a = np.searchsorted(sorted_totals, lo, side="left")
+    b = np.searchsorted(sorted_totals, hi, side="right")
+    return cdf0[b] - cdf0[a]
+
+
+def tier_mix_curves(p, plan, tolerances, targets=None, mode="exact", seed=None):
+    """
+    P(close gap) on the tier-mix grid for every tolerance x target ARR.
+
+    `targets` are target exit ARRs (default: the plan's own target). N_new stays
+    at the plan's required_new_customers, so only the band around the gap moves.
+    Returns {tolerances, targets, gap_mrr, f1Vec, f2Vec, prob, best_prob,
+    recommended, curve, N_new}: prob has shape (targets, tolerances, f2, f1),
+    best_prob is the grid maximum per (target, tolerance), and curve is the
+    (target, tolerance) curve at the cell recommended for the input tolerance.
+    """
+    N_new, tiers, gap_mrr, tol, iters = tier_inputs(p, plan)
+    tolerances = np.clip(np.atleast_1d(np.asarray(tolerances, dtype=float)), 0.0, 0.5)
+    if targets is None:
+        targets = [safe_float(p.get("target_exit_arr_2026"), 0)]
+    targets = np.atleast_1d(np.asarray(targets, dtype=float))
+    exit_arr = safe_float(p.get("exit_arr_2025"), 0)
+    gaps = np.maximum(0.0, targets - exit_arr) / 12.0
+    if N_new <= 0:
+        return {"tolerances": tolerances, "targets": targets, "gap_mrr": gaps, "f1Vec": None,
+                "f2Vec": None, "prob": None, "best_prob": None, "recommended": None,
+                "curve": None, "N_new": 0}
+
+    lo = (gaps[:, None] - tolerances[None, :] * gaps[:, None]).ravel()
+    hi = (gaps[:, None] + tolerances[None, :] * gaps[:, None]).ravel()
+    always = np.repeat(gaps <= 0, len(tolerances))
+
+    f1Vec, f2Vec = simplex_axis(), simplex_axis()
+    shape = (len(targets), len(tolerances), len(f2Vec), len(f1Vec))
+    prob = np.full(shape, np.nan)
+    base = np.full((len(f2Vec), len(f1Vec)), np.nan)
+    mean_mrpu = np.full_like(base, np.nan)
+
+    if mode == "exact":
+        lattice = count_lattice(N_new)
+        totals = lattice[0] * tiers[0] + lattice[1] * tiers[1] + lattice[2] * tiers[2]
+        order = np.argsort(totals, kind="stable")
+        sorted_totals = totals[order]
+    elif mode == "mc":
+        entropy = np.random.SeedSequence(seed).entropy
+        uniform_cdf = np.arange(1, iters + 1) / iters
+    else:
+        raise ValueError("tier_mix_curves supports mode='exact' or 'mc', not %r" % mode)
+
+    for j, i, f1, f2, f3 in grid_cells(f1Vec, f2Vec):
+        if mode == "exact":
+            cdf = np.minimum(1.0, np.cumsum(lattice_pmf(lattice, f1, f2, f3)[order]))
+            cell_totals = sorted_totals
+            mean_mrpu[j, i] = f1 * tiers[0] + f2 * tiers[1] + f3 * tiers[2]
+        else:
+            counts = cell_rng(entropy, j, i).multinomial(N_new, [f1, f2, f3], size=iters)
+            cell_totals = np.sort(counts @ tiers)
+            cdf = uniform_cdf
+            mean_mrpu[j, i] = cell_totals.mean() / N_new
+        band = np.where(always, 1.0, _band_probs(cell_totals, cdf, lo, hi))
+        prob[:, :, j, i] = band.reshape(len(targets), len(tolerances))
+        base_band = _band_probs(cell_totals, cdf, [gap_mrr - tol * gap_mrr], [gap_mrr + tol * gap_mrr])
+        base[j, i] = 1.0 if gap_mrr <= 0 else base_band[0]
+
+    recommended = recommend(f1Vec, f2Vec, base, mean_mrpu)
+    jr = int(np.argmin(np.abs(f2Vec - recommended["f2"])))
+    ir = int(np.argmin(np.abs(f1Vec - recommended["f1"])))
+    return {
+        "tolerances": tolerances,
+        "targets": targets,
+        "gap_mrr": gaps,
+        "f1Vec": f1Vec,
+        "f2Vec": f2Vec,
+        "prob": prob,
+        "best_prob": np.nanmax(prob, axis=(2, 3)),
+        "recommended": recommended,
+        "curve": prob[:, :, jr, ir],
+        "N_new": N_new,
+    }
@@ -0,0 +1,61 @@
+# Planner inputs for one region. The generated page, the sweep runner and the
+# engine examples all start from these values.
+
+DEFAULTS = {
+    "exit_arr_2025": 4200000,        # EUR
+    "target_exit_arr_2026": 6500000, # EUR
+    "customers_present_2025": 54,
+    "median_mrpu": 7500,             # monthly EUR
+    "median_mrpu_customers": 49,
+    "max_mrpu": 30000,               # monthly EUR
+    "max_mrpu_customers": 2,
+
+    # Present (status-quo) funnel rates
+    "reach_rate_present": 0.50,
+    "meeting_rate_present": 0.25,
+    "win_rate_present": 0.09,
+
+    # ICP counts
+    "ICP_2025": 1000,                # present ICP (2025)
+    "ICP_2026": 300,                 # planned ICP (2026)
+    "ICP_current_2026": 150,         # status-quo ICP already active in 2026
+
+    # uplift weights (for distribution of uplift across reach/meet/win)
+    "uplift_weight_reach": 1.0,
+    "uplift_weight_meet": 1.0,
+    "uplift_weight_win": 1.0,
+
+    # unit economics inputs
+    "ndr_target": 1.10,              # Net Dollar Retention target (e.g. 1.10 = 110%)
+    "payback_months_2025": 14,       # current payback period in months (2025)
+    "payback_months": 10,            # desired payback period in months (2026 / target)
+    "ideal_customer_lifetime_years": 3.0,  # ideal customer lifetime in years
+
+    # GM + revenue share + tier MRPUs
+    "gm_2025": 0.07,                 # 7% gross margin 2025
+    "gm_2026_anticipated": 0.10,     # 10% target GM 2026
+    "rev_share_infra_2025": 0.95,    # 95% infra revenue share 2025
+    "rev_share_managed_2025": 0.05,  # 5% managed share 2025
+    "tier1_mrpu": 35000,             # high MRPU tier (monthly)
+    "tier2_mrpu": 12500,             # mid MRPU tier (monthly)
+    "tier3_mrpu": 6000,              # long tail tier (monthly)
+
+    # Monte Carlo tuning for tier mix
+    "gap_tolerance_pct": 0.07,       # ±7% band around gap MRR for "close"
+    "mc_tier_iterations": 5000,      # #iterations per grid cell
+    "mc_crn_seed": 1,                # >0: same uniform stream for every cell (common random numbers); 0: fresh Math.random()
+    "tier_mix_funnel": 1,            # N_new for the tier mix: 0 = required new customers, 1 = wins from the proposed funnel, 2 = from the present funnel
+
+    # Stochastic funnel (Beta-distributed rates, chained binomial wins)
+    "funnel_trials": 100000,         # simulated years behind P(wins >= required new customers)
+    "funnel_rate_uncertainty": 0     # ±relative error of present rates at 90% confidence; 0 = from 2025 counts
+}
+
+# What compute_plan() reads for an input that is missing or not a finite number;
+# every other input falls back to 0. Keep in step with plan.py / plan_batch.py.
+PLAN_FALLBACKS = {
+    "uplift_weight_reach": 1.0,
+    "uplift_weight_meet": 1.0,
+    "uplift_weight_win": 1.0,
+    "ndr_target": 1.0,
+}
@@ -0,0 +1,77 @@
+# Build-time results embedded in the generated page, so the first render does
+# not have to run the tier-mix Monte Carlo in the browser.
+
+import base64
+
+import numpy as np
+
+from .ktier import k_tier_mix, tier_mrpus
+from .funnel import wins_pmf
+from .plan import compute_plan
+from .refine import refine_tier_mix
+from .tier_mix import joint_funnel, joint_lattice, tier_inputs, tier_mix_monte_carlo
+from .timing import stage
+
+
+def encode_f32(a):
+    """Little-endian float32 bytes of `a`, base64 encoded (NaN survives the round trip)."""
+    return base64.b64encode(np.ascontiguousarray(a, dtype="<f4").tobytes()).decode("ascii")
+
+
+def precompute_payload(p, mode="exact", seed=0, refine=None):
+    """
+    Plan and tier-mix result for `p` in the shape the page's renderers expect,
+    with the heatmap z packed as {z_b64, rows, cols} instead of nested arrays.
+    Inputs with more than three tierK_mrpu keys also get the K-tier marginals.
+    When p's tier_mix_funnel draws N_new from the funnel, the tier mix runs in
+    mode="joint" whatever `mode` says, as the page does. `seed` fixes the sampled
+    parts (mode="mc", the K-tier marginals), so rebuilding the page for the same
+    inputs embeds the same results.
+
+    refine (True or a dict of refine_tier_mix() options) embeds the adaptive-mesh
+    search instead of the grid: a scattered heatmap {f1, f2, z, scattered: true}.
+    """
+    with stage("compute_plan"):
+        plan = compute_plan(p)
+    funnel = joint_funnel(p)
+    if funnel is not None:
+        mode = "joint"
+    if refine:
+        opts = dict(refine) if isinstance(refine, dict) else {}
+        if funnel is not None:
+            opts["wins"] = wins_pmf(p, plan, rates=funnel)
+        tier = refine_tier_mix(p, plan, mode=mode, seed=seed, **opts)
+        if funnel is not None and tier["heatmap"] is not None:
+            # The summary fields tier_mix_monte_carlo() adds in joint mode
+            tier["wins"] = {"mean": float(np.arange(len(opts["wins"])) @ opts["wins"]), "funnel": funnel}
+            tier["resolution"] = joint_lattice(*tier_inputs(p, plan)[1:4])[0]
+    elif funnel is not None:
+        tier = tier_mix_monte_carlo(p, plan, seed=seed, mode=mode, funnel=funnel)
+        tier["wins"] = {"mean": tier["wins"]["mean"], "funnel": funnel}
+    else:
+        tier = tier_mix_monte_carlo(p, plan, seed=seed, mode=mode)
+    heatmap = tier["heatmap"]
+    if heatmap is not None and heatmap.get("scattered"):
+        heatmap = {"f1": heatmap["f1"].tolist(), "f2": heatmap["f2"].tolist(),
+                   "z": heatmap["z"].tolist(), "scattered": True}
+    elif heatmap is not None:
+        z = heatmap["z"]
+        heatmap = {
+            "f1Vec": [float(f) for f in heatmap["f1Vec"]],
+            "f2Vec": [float(f) for f in heatmap["f2Vec"]],
+            "z_b64": encode_f32(z),
+            "rows": z.shape[0],
+            "cols": z.shape[1],
+        }
+    tier = dict(tier, heatmap=heatmap)
+    mrpus = tier_mrpus(p)
+    if len(mrpus) > 3:
+        kres = k_tier_mix(p, plan, seed=seed)
+        if kres["marginals"] is not None:
+            tier.update(marginals=kres["marginals"].tolist(), levels=kres["levels"].tolist(),
+                        tier_mrpus=mrpus)
+    return {
+        "mode": mode,
+        "plan": plan,
+        "tier": tier,
+    }
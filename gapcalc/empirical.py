@@ -0,0 +1,211 @@
+# Empirical MRPU distributions from a customer export, for bootstrapping new
+# customers' MRPU in the tier-mix Monte Carlo instead of using tierK_mrpu points:
+#
+#   sketches = load_mrpu_sketches("customers.csv", cache=ResultCache(".gapcalc_cache"))
+#   res = tier_mix_monte_carlo(p, plan, seed=1, mrpu=tier_sketch_list(sketches))
+#
+#   python -m gapcalc.empirical customers.csv [--tier-col tier] [--mrpu-col mrpu] [--cache-dir DIR]
+#
+# The CSV is streamed `chunk_rows` rows at a time into one MRPUSketch per tier:
+# a log-bucketed histogram (DDSketch-style) whose quantiles and samples are within
+# relative error `alpha` of the data, in a few hundred buckets however many rows
+# there are. Rows are assigned to tiers by the tier column ("1", "tier2", ...),
+# or, without one, to the tier whose tierK_mrpu is nearest. With a cache, the
+# sketches are keyed by the file's path, size and mtime, so repeat runs skip the scan.
+
+import argparse
+import csv
+import hashlib
+import itertools
+import math
+import os
+import re
+import sys
+
+import numpy as np
+
+from .cache import canonical_key
+from .ktier import AliasTable
+
+
+class MRPUSketch:
+    """Mergeable log-bucketed histogram of non-negative MRPUs with relative accuracy `alpha`."""
+
+    def __init__(self, alpha=0.01):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self.index = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros(0, dtype=np.int64)
+        self.zeros = 0
+        self.n = 0
+        self.total = 0.0
+        self._alias = None
+
+    def add(self, values):
+        """Add an array of MRPUs; negative and non-finite values are ignored."""
+        v = np.asarray(values, dtype=float)
+        v = v[np.isfinite(v) & (v >= 0)]
+        pos = v[v > 0]
+        self.zeros += len(v) - len(pos)
+        self.n += len(v)
+        self.total += float(v.sum())
+        if len(pos):
+            idx, cnt = np.unique(np.ceil(np.log(pos) / math.log(self.gamma)).astype(np.int64),
+                                 return_counts=True)
+            self._merge(idx, cnt)
+        return self
+
+    def merge(self, other):
+        if other.alpha != self.alpha:
+            raise ValueError("cannot merge sketches with different alpha")
+        self._merge(other.index, other.count)
+        self.zeros += other.zeros
+        self.n += other.n
+        self.total += other.total
+        return self
+
+    def _merge(self, idx, cnt):
+        keys, inv = np.unique(np.concatenate([self.index, idx]), return_inverse=True)
+        self.count = np.bincount(inv, weights=np.concatenate([self.count, cnt])).astype(np.int64)
+        self.index = keys
+        self._alias = None
+
+    def values(self):
+        """Bucket representatives (0 first if any zeros), each within alpha of its members."""
+        reps = 2 * self.gamma ** self.index.astype(float) / (self.gamma + 1)
+        return np.concatenate([[0.0], reps]) if self.zeros else reps
+
+    def weights(self):
+        return np.concatenate([[self.zeros], self.count]) if self.zeros else self.count
+
+    def mean(self):
+        return self.total / self.n if self.n else float("nan")
+
+    def quantile(self, q):
+        if not self.n:
+            return float("nan")
+        cum = np.cumsum(self.weights())
+        return float(self.values()[np.searchsorted(cum, q * (self.n - 1), side="right")])
+
+    def sample(self, rng, size):
+        """Bootstrap `size` MRPUs from the sketch."""
+        if not self.n:
+            raise ValueError("cannot sample from an empty MRPU sketch")
+        if self._alias is None:
+            self._alias = (AliasTable(self.weights()), self.values())
+        table, values = self._alias
+        return values[table.sample(rng, size)]
+
+    def digest(self):
+        """Content hash, for cache keys."""
+        h = hashlib.sha256(repr((self.alpha, self.zeros, self.n)).encode())
+        h.update(self.index.tobytes())
+        h.update(self.count.tobytes())
+        return h.hexdigest()
+
+    def __getstate__(self):
+        return dict(self.__dict__, _alias=None)
+
+
+def _tier_number(label):
+    m = re.search(r"\d+", label)
+    return int(m.group()) if m else None
+
+
+def load_mrpu_sketches(path, tier_col="tier", mrpu_col="mrpu", tiers=None, alpha=0.01,
+                       chunk_rows=100000, cache=None):
+    """
+    {tier number: MRPUSketch} for the customer CSV at `path`.
+
+    Without a `tier_col` column, rows go to the nearest of `tiers` (MRPUs of
+    tier 1, 2, ...). `cache` is a ResultCache; a hit skips reading the file.
+    """
+    st = os.stat(path)
+    key = canonical_key("mrpu_sketch", {
+        "path": os.path.abspath(path), "size": st.st_size, "mtime_ns": str(st.st_mtime_ns),
+        "tier_col": tier_col, "mrpu_col": mrpu_col, "alpha": alpha,
+        "tiers": None if tiers is None else [float(t) for t in tiers],
+    })
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    sketches = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader)]
+        if mrpu_col.lower() not in header:
+            raise ValueError("%s has no %r column (columns: %s)" % (path, mrpu_col, ", ".join(header)))
+        m_at = header.index(mrpu_col.lower())
+        t_at = header.index(tier_col.lower()) if tier_col and tier_col.lower() in header else None
+        if t_at is None and tiers is None:
+            raise ValueError("%s has no %r column; pass tiers=[tier1_mrpu, ...] to assign rows"
+                             % (path, tier_col))
+        centers = None if tiers is None else np.asarray(tiers, dtype=float)
+        tier_of = {}  # tier label -> tier number
+
+        while True:
+            rows = list(itertools.islice(reader, chunk_rows))
+            if not rows:
+                break
+            rows = [r for r in rows if len(r) > max(m_at, t_at or 0)]
+            mrpu = np.array([_float(r[m_at]) for r in rows])
+            if t_at is not None:
+                labels = np.array([tier_of[r[t_at]] if r[t_at] in tier_of
+                                   else tier_of.setdefault(r[t_at], _tier_number(r[t_at]))
+                                   for r in rows], dtype=object)
+                groups = {k: mrpu[labels == k] for k in set(labels.tolist()) if k is not None}
+            else:
+                nearest = np.abs(mrpu[:, None] - centers[None, :]).argmin(axis=1) + 1
+                groups = {int(k): mrpu[nearest == k] for k in np.unique(nearest)}
+            for k, values in groups.items():
+                sketches.setdefault(k, MRPUSketch(alpha)).add(values)
+
+    if cache is not None:
+        cache.put(key, sketches)
+    return sketches
+
+
+def _float(s):
+    try:
+        return float(s)
+    except ValueError:
+        return math.nan
+
+
+def tier_sketch_list(sketches, K=3):
+    """[sketch for tier 1, ..., tier K] for tier_mix_monte_carlo(mrpu=...); None where a tier has no data."""
+    return [sketches.get(k) if sketches.get(k) is not None and sketches[k].n else None
+            for k in range(1, K + 1)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gapcalc.empirical",
+                                     description="Summarize per-tier MRPU sketches of a customer CSV.")
+    parser.add_argument("csv")
+    parser.add_argument("--tier-col", default="tier")
+    parser.add_argument("--mrpu-col", default="mrpu")
+    parser.add_argument("--tiers", default=None,
+                        help="comma-separated tier MRPUs, to assign rows when there is no tier column")
+    parser.add_argument("--alpha", type=float, default=0.01)
+    parser.add_argument("--cache-dir", default=None)
+    args = parser.parse_args(argv)
+
+    from .cache import ResultCache
+    # Under `python -m` this file is __main__; cache sketches as gapcalc.empirical.MRPUSketch
+    from .empirical import load_mrpu_sketches
+
+    tiers = [float(t) for t in args.tiers.split(",")] if args.tiers else None
+    sketches = load_mrpu_sketches(args.csv, args.tier_col, args.mrpu_col, tiers, args.alpha,
+                                  cache=ResultCache(args.cache_dir) if args.cache_dir else None)
+    print("%-6s %10s %10s %10s %10s %10s %8s" % ("tier", "customers", "mean", "p10", "p50", "p90", "buckets"))
+    for k in sorted(sketches):
+        s = sketches[k]
+        print("%-6d %10d %10.0f %10.0f %10.0f %10.0f %8d" % (
+            k, s.n, s.mean(), s.quantile(0.1), s.quantile(0.5), s.quantile(0.9), len(s.index)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+# Stochastic funnel: how many 2026 wins the ICP_2026 funnel actually produces,
+# instead of the point estimate ICP_2026 x reach x meet x win.
+#
+# Each trial draws the reach, meeting and win rates from Beta distributions with
+# the plan's rates as means, then ICP -> reached -> meetings -> wins as chained
+# binomials. Trials run as batched NumPy arrays, `chunk` at a time.
+#
+# Rate uncertainty comes from the 2025 funnel counts (ICP_2025 accounts reached,
+# their meetings, their wins), which act as the Beta concentration. Alternatively
+# funnel_rate_uncertainty = e sets a relative half-width of +-e at 90% confidence.
+# The "proposed" (uplifted) rates reuse the same concentrations.
+#
+# wins_pmf() gives the same wins distribution exactly, without sampling: with one
+# rate draw per stage and year, each stage is a beta-binomial (binomial for a
+# fixed rate) transition from the previous stage's count. Transitions are built
+# in row blocks over the window of counts the rate can reach, and each stage is
+# trimmed to its central mass, so memory stays flat as ICP_2026 grows.
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from .plan import compute_plan, js_round, safe_float
+
+STAGES = ("reach", "meet", "win")
+RATE_CONFIDENCE = 0.90
+
+
+def rate_concentrations(p, plan):
+    """Beta concentration (a + b) per funnel stage: observed 2025 counts, or from funnel_rate_uncertainty."""
+    rates = (plan["reach0"], plan["meet0"], plan["win0"])
+    rel = max(0.0, safe_float(p.get("funnel_rate_uncertainty"), 0))
+    if rel > 0:
+        z = NormalDist().inv_cdf(0.5 + RATE_CONFIDENCE / 2)
+        out = []
+        for r in rates:
+            sd = rel * r / z
+            out.append(max(1.0, r * (1 - r) / (sd * sd) - 1) if sd > 0 else np.inf)
+        return out
+    icp = plan["ICP_2025"]
+    return [icp, icp * rates[0], icp * rates[0] * rates[1]]
+
+
+def beta_params(p, plan, rates="present"):
+    """[(a, b)] per stage with the present (or proposed) rates as means; a or b = inf means a fixed rate."""
+    if rates == "present":
+        means = (plan["reach0"], plan["meet0"], plan["win0"])
+    elif rates == "proposed":
+        means = (plan["proposed_reach"], plan["proposed_meet"], plan["proposed_win"])
+    else:
+        raise ValueError("unknown funnel rates %r (expected present or proposed)" % rates)
+    out = []
+    for m, k in zip(means, rate_concentrations(p, plan)):
+        if not np.isfinite(k) or k <= 0 or m <= 0 or m >= 1:
+            out.append((m, np.inf))  # degenerate: the rate is exactly m
+        else:
+            out.append((m * k, (1 - m) * k))
+    return out
+
+
+def _rates(rng, a, b, size):
+    if not np.isfinite(b):
+        return np.full(size, a)
+    return rng.beta(a, b, size)
+
+
+def funnel_simulation(p, plan=None, trials=None, seed=None, rates="present", chunk=250000):
+    """
+    Distribution of 2026 wins from ICP_2026 accounts over `trials` (default
+    funnel_trials) simulated years.
+
+    Returns {trials, required, p_enough, mean_wins, quantiles: {p05, p50, p95},
+    hist, beta}: hist[w] is the fraction of trials with w wins, p_enough is
+    P(wins >= required_new_customers).
+    """
+    plan = compute_plan(p) if plan is None else plan
+    trials = js_round(safe_float(p.get("funnel_trials"), 100000)) if trials is None else trials
+    trials = max(1, int(trials))
+    icp = js_round(plan["ICP_2026"])
+    params = beta_params(p, plan, rates)
+    rng = np.random.default_rng(seed)
+
+    hist = np.zeros(icp + 1, dtype=np.int64)
+    done = 0
+    while done < trials:
+        n = min(chunk, trials - done)
+        counts = np.full(n, icp, dtype=np.int64)
+        for a, b in params:
+            counts = rng.binomial(counts, _rates(rng, a, b, n))
+        hist += np.bincount(counts, minlength=icp + 1)
+        done += n
+
+    wins = np.arange(icp + 1)
+    freq = hist / trials
+    cdf = np.cumsum(freq)
+    required = plan["required_new_customers"]
+    p_enough = float(freq[wins >= required].sum()) if np.isfinite(required) else 0.0
+    return {
+        "trials": trials,
+        "required": required,
+        "p_enough": p_enough,
+        "mean_wins": float(wins @ freq),
+        "quantiles": {name: int(np.searchsorted(cdf, q)) for name, q in
+                      (("p05", 0.05), ("p50", 0.5), ("p95", 0.95))},
+        "hist": freq,
+        "beta": [list(ab) for ab in params],
+    }
+
+
+_lgamma = np.vectorize(math.lgamma, otypes=[float])
+# Largest transition matrix block wins_pmf() builds at once (float64 entries)
+STAGE_BLOCK = 2 ** 22
+
+
+def _rate_range(a, b, tail, grid=20000):
+    """(lo, hi) rates outside which a Beta(a, b) (or fixed rate a) pass rate has at most ~`tail` mass."""
+    if not np.isfinite(b):
+        return a, a
+    x = (np.arange(grid) + 0.5) / grid
+    log_d = (a - 1) * np.log(x) + (b - 1) * np.log1p(-x)
+    cdf = np.cumsum(np.exp(log_d - log_d.max()))
+    cdf /= cdf[-1]
+    lo = np.searchsorted(cdf, tail, side="right")
+    hi = np.searchsorted(cdf, 1 - tail, side="left")
+    return max(0.0, (lo - 1) / grid), min(1.0, (hi + 1) / grid)
+
+
+def _stage_matrix(m, k, a, b, log_fact, lg):
+    """
+    T[r, c] = P(k[c] pass | m[r] enter) for one stage with Beta(a, b) (or fixed
+    rate a) pass rate; lg = lgamma tables (j + a, j + b, j + a + b) for Beta rates.
+    """
+    valid = (k[None, :] <= m[:, None]) & (k[None, :] >= 0)
+    kk = np.clip(k, 0, None)[None, :]
+    mk = np.where(valid, m[:, None] - kk, 0)
+    kk = np.where(valid, kk, 0)
+    log_t = log_fact[m][:, None] - log_fact[kk] - log_fact[mk]
+    if np.isfinite(b):
+        la, lb, lab = lg
+        log_t = (log_t + la[kk] + lb[mk] - lab[m][:, None]
+                 + math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b))
+    elif a <= 0 or a >= 1:
+        hit = kk == (0 if a <= 0 else m[:, None])
+        return np.where(valid & hit, 1.0, 0.0)
+    else:
+        log_t = log_t + kk * math.log(a) + mk * math.log1p(-a)
+    return np.exp(np.where(valid, log_t, -np.inf))
+
+
+def _thin(support, prob, a, b, log_fact, tail):
+    """Distribution of the count passing one stage, given `prob` over the entering counts `support`."""
+    top = int(support.max())
+    lg = None
+    if np.isfinite(b):
+        j = np.arange(top + 1)
+        lg = (_lgamma(j + a), _lgamma(j + b), _lgamma(j + a + b))
+    # Counts k with k / m outside the rate's range (plus binomial noise) carry ~no mass,
+    # so each block of entering counts only needs a window of columns
+    r_lo, r_hi = _rate_range(a, b, tail)
+    dist = np.zeros(top + 1)
+    rows = max(1, STAGE_BLOCK // (top + 1))
+    for s in range(0, len(support), rows):
+        m = support[s:s + rows]
+        m_lo, m_hi = int(m.min()), int(m.max())
+        slack = 10 * math.sqrt(m_hi / 4) + 10
+        k0 = max(0, int(m_lo * r_lo - slack))
+        k1 = min(m_hi, int(math.ceil(m_hi * r_hi + slack))) + 1
+        dist[k0:k1] += prob[s:s + rows] @ _stage_matrix(m, np.arange(k0, k1), a, b, log_fact, lg)
+    return dist
+
+
+def _tail_trim(dist, tail):
+    """(lo, hi) such that dist[lo:hi] drops at most `tail` of the total mass at either end."""
+    t = tail * dist.sum()
+    lo = int(np.searchsorted(np.cumsum(dist), t, side="right"))
+    hi = len(dist) - int(np.searchsorted(np.cumsum(dist[::-1]), t, side="right"))
+    return lo, max(hi, lo + 1)
+
+
+def wins_pmf(p, plan=None, rates="present", compound=True, tail=1e-12):
+    """
+    Exact P(wins = n), n = 0..N, of the funnel_simulation() model, trimmed after
+    the last n whose upper tail still holds more than `tail` of the mass.
+    compound=False drops the rate uncertainty: Binomial(ICP_2026, reach x meet x win).
+    """
+    plan = compute_plan(p) if plan is None else plan
+    icp = js_round(plan["ICP_2026"])
+    params = beta_params(p, plan, rates)
+    if not compound:
+        params = [(a / (a + b) if np.isfinite(b) else a, np.inf) for a, b in params]
+    log_fact = np.concatenate([[0.0], np.cumsum(np.log(np.arange(1, icp + 1)))])
+
+    # wins | rates ~ Binomial(ICP_2026, reach x meet x win) whatever the stage order,
+    # so thin by the smallest rate first to keep the transition matrices small
+    params.sort(key=lambda ab: ab[0] / (ab[0] + ab[1]) if np.isfinite(ab[1]) else ab[0])
+    support, prob = np.array([icp]), np.array([1.0])
+    for a, b in params:
+        dist = _thin(support, prob, a, b, log_fact, tail / len(params))
+        lo, hi = _tail_trim(dist, tail / len(params))
+        support, prob = np.arange(lo, hi), dist[lo:hi]
+
+    pmf = np.zeros(support.max() + 1)
+    pmf[support] = prob
+    pmf /= pmf.sum()
+    upper = np.cumsum(pmf[::-1])[::-1]  # upper[n] = P(wins >= n)
+    return pmf[:max(1, int(np.count_nonzero(upper > tail)))]
@@ -0,0 +1,113 @@
+# Input -> stage dependency graph for the planner, shared by the Python engine
+# (IncrementalPlanner) and the generated page (embedded as STAGE_DEPS), so
+# that an input change only reruns the stages that read it. The tier mix and
+# the funnel simulation are the expensive stages. The tier mix is also skipped
+# when its effective inputs (N_new, gap MRR, tier MRPUs, tolerance, iterations,
+# and the funnel rates when tier_mix_funnel draws N_new from the funnel) come
+# out unchanged.
+
+from .plan import compute_plan
+from .timing import stage
+
+GAP_INPUTS = (
+    "exit_arr_2025", "target_exit_arr_2026", "median_mrpu", "median_mrpu_customers",
+    "max_mrpu", "max_mrpu_customers",
+)
+FUNNEL_INPUTS = (
+    "reach_rate_present", "meeting_rate_present", "win_rate_present",
+    "ICP_2025", "ICP_2026", "ICP_current_2026",
+    "uplift_weight_reach", "uplift_weight_meet", "uplift_weight_win",
+)
+UNIT_INPUTS = (
+    "ndr_target", "payback_months_2025", "payback_months", "ideal_customer_lifetime_years",
+    "gm_2025", "gm_2026_anticipated",
+)
+TIER_INPUTS = ("tier1_mrpu", "tier2_mrpu", "tier3_mrpu", "gap_tolerance_pct", "mc_tier_iterations",
+               "mc_crn_seed", "tier_mix_funnel")
+FUNNEL_SIM_INPUTS = ("funnel_trials", "funnel_rate_uncertainty")
+PLAN_INPUTS = GAP_INPUTS + FUNNEL_INPUTS + UNIT_INPUTS
+# computePlan outputs the funnel's wins distribution (funnel.wins_pmf) depends on
+JOINT_PLAN_KEYS = ("ICP_2025", "ICP_2026", "reach0", "meet0", "win0",
+                   "proposed_reach", "proposed_meet", "proposed_win")
+
+# stage -> input keys it reads, directly or through computePlan
+STAGE_DEPS = {
+    "plan": PLAN_INPUTS,
+    "kpis": PLAN_INPUTS + ("gap_tolerance_pct", "mc_tier_iterations"),
+    "insights": PLAN_INPUTS + FUNNEL_SIM_INPUTS,
+    "funnel_sim": GAP_INPUTS + FUNNEL_INPUTS + FUNNEL_SIM_INPUTS,
+    "funnel_chart": GAP_INPUTS + FUNNEL_INPUTS,
+    "funnel_status_chart": GAP_INPUTS + FUNNEL_INPUTS,
+    "payback_gm_chart": ("gm_2025", "gm_2026_anticipated", "payback_months_2025", "payback_months"),
+    "tier_mix": GAP_INPUTS + TIER_INPUTS + FUNNEL_INPUTS + ("funnel_rate_uncertainty",),
+}
+
+
+def affected_stages(changed):
+    """Stages that read any key in `changed` (None means everything changed)."""
+    if changed is None:
+        return set(STAGE_DEPS)
+    changed = set(changed)
+    return {stage for stage, keys in STAGE_DEPS.items() if changed.intersection(keys)}
+
+
+class IncrementalPlanner:
+    """
+    Holds the last inputs, plan, funnel simulation and tier-mix result; update(p)
+    reruns only the stages whose inputs changed. `tier_kwargs` are passed to
+    tier_mix_monte_carlo (or to cache.tier_mix when a ResultCache is given);
+    `funnel_seed` seeds funnel_simulation. Like the page, the tier mix runs in
+    mode="joint" when p's tier_mix_funnel is set, unless tier_kwargs picks a mode.
+    """
+
+    def __init__(self, tier_kwargs=None, cache=None, funnel_seed=None):
+        self.tier_kwargs = dict(tier_kwargs or {})
+        self.cache = cache
+        self.funnel_seed = funnel_seed
+        self.inputs = None
+        self.plan = None
+        self.funnel = None
+        self.tier = None
+        self._tier_key = None
+
+    def update(self, p):
+        """Returns {plan, funnel, tier_mix, ran}, where `ran` lists the stages actually recomputed."""
+        if self.inputs is None:
+            changed = None
+        else:
+            keys = set(p) | set(self.inputs)
+            changed = {k for k in keys if p.get(k) != self.inputs.get(k)}
+        stages = affected_stages(changed)
+        ran = []
+
+        if "plan" in stages or self.plan is None:
+            with stage("compute_plan"):
+                self.plan = compute_plan(p)
+            ran.append("plan")
+        if "funnel_sim" in stages or self.funnel is None:
+            from .funnel import funnel_simulation  # numpy, only needed here
+
+            with stage("funnel_sim"):
+                self.funnel = {rates: funnel_simulation(p, self.plan, seed=self.funnel_seed, rates=rates)
+                               for rates in ("present", "proposed")}
+            ran.append("funnel_sim")
+        if "tier_mix" in stages or self.tier is None:
+            from .tier_mix import joint_funnel, tier_inputs, tier_mix_monte_carlo  # numpy, only needed here
+
+            N_new, tiers, gap_mrr, tol, iters = tier_inputs(p, self.plan)
+            kwargs = dict(self.tier_kwargs)
+            funnel = joint_funnel(p)
+            key = (N_new, tuple(tiers), gap_mrr, tol, iters, funnel)
+            if funnel is not None and "mode" not in kwargs:
+                kwargs.update(mode="joint", funnel=funnel)
+                key += tuple(self.plan[k] for k in JOINT_PLAN_KEYS) + (p.get("funnel_rate_uncertainty"),)
+            if key != self._tier_key:
+                if self.cache is not None:
+                    self.tier = self.cache.tier_mix(p, self.plan, **kwargs)
+                else:
+                    self.tier = tier_mix_monte_carlo(p, self.plan, **kwargs)
+                self._tier_key = key
+                ran.append("tier_mix")
+
+        self.inputs = dict(p)
+        return {"plan": self.plan, "funnel": self.funnel, "tier_mix": self.tier, "ran": ran}
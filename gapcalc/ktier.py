@@ -0,0 +1,141 @@
+# K-tier generalization of the tier-mix engine. Tier MRPUs come from
+# tier1_mrpu, tier2_mrpu, ... in the inputs (or an explicit list). The
+# K-simplex is enumerated chunk by chunk at `step` resolution. Every mix puts
+# whole 1/m = step slices of the simplex on its tiers, so a batch of mixes shares
+# one draw of multinomial counts over the m slices per iteration; a mix's tier
+# counts are sums of its slices, and the MRR totals of the whole batch are one
+# (iterations x m) @ (m x mixes) product instead of a draw per customer. Only
+# cells above `min_prob` are kept, plus per-tier marginals, so memory does not
+# grow with the number of mixes.
+
+import itertools
+from math import comb
+
+import numpy as np
+
+from .plan import js_round, safe_float
+from .tier_mix import gap_ok, tier_inputs
+
+# MRR totals (iterations x mixes) evaluated at once in k_tier_mix()
+DRAW_BLOCK = 2 ** 22
+
+
+def tier_mrpus(p):
+    """[tier1_mrpu, tier2_mrpu, ...] for as many consecutive tierK_mrpu keys as `p` has."""
+    out = []
+    while "tier%d_mrpu" % (len(out) + 1) in p:
+        out.append(safe_float(p["tier%d_mrpu" % (len(out) + 1)], 0))
+    return out
+
+
+class AliasTable:
+    """Vose alias method: O(K) setup, O(1) per categorical draw."""
+
+    def __init__(self, probs):
+        probs = np.asarray(probs, dtype=float)
+        K = len(probs)
+        scaled = probs * (K / probs.sum())
+        self.prob = np.ones(K)
+        self.alias = np.arange(K)
+        small = [k for k in range(K) if scaled[k] < 1.0]
+        large = [k for k in range(K) if scaled[k] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+
+    def sample(self, rng, size):
+        u = rng.random(size) * len(self.prob)
+        k = u.astype(np.int64)
+        return np.where(u - k < self.prob[k], k, self.alias[k])
+
+
+def simplex_points(K, m, chunk=65536):
+    """
+    Yield int arrays (n, K) of every composition of m into K parts, i.e. every
+    mix on the K-simplex at step 1/m, `chunk` rows at a time.
+    """
+    bars = itertools.combinations(range(m + K - 1), K - 1)
+    while True:
+        block = np.array(list(itertools.islice(bars, chunk)), dtype=np.int64).reshape(-1, K - 1)
+        if not len(block):
+            return
+        edges = np.hstack([np.full((len(block), 1), -1), block, np.full((len(block), 1), m + K - 1)])
+        yield np.diff(edges, axis=1) - 1
+
+
+def k_tier_mix(p, plan, tiers=None, step=0.1, iterations=None, seed=None, min_prob=0.01):
+    """
+    Monte Carlo P(close gap) for every mix of K tiers at `step` resolution.
+
+    Returns {recommended: {fractions, prob_gap, mean_avg_mrpu}, points, prob,
+    mean_mrpu, marginals, levels, K, n_cells, N_new, tolPct}. `points` holds the
+    kept mixes as counts of `step` (rows sum to 1/step), with prob >= min_prob.
+    marginals[k, l] is the best prob_gap over all mixes with tier k at levels[l].
+    """
+    N_new, _, gap_mrr, tol, iters = tier_inputs(p, plan)
+    tiers = np.asarray(tier_mrpus(p) if tiers is None else tiers, dtype=float)
+    K = len(tiers)
+    m = js_round(1.0 / step)
+    if N_new <= 0 or K < 2:
+        return {"recommended": None, "points": None, "prob": None, "mean_mrpu": None,
+                "marginals": None, "levels": None, "K": K, "n_cells": 0, "N_new": N_new, "tolPct": tol}
+    iters = iters if iterations is None else max(1, int(iterations))
+
+    rng = np.random.default_rng(seed)
+    marginals = np.zeros((K, m + 1))
+    kept_pts, kept_prob, kept_mrpu = [], [], []
+    best = None
+
+    for block in simplex_points(K, m):
+        prob = np.empty(len(block))
+        mrpu = np.empty(len(block))
+        rows = max(1, DRAW_BLOCK // iters)
+        for s in range(0, len(block), rows):
+            # slice_mrpu[r, l]: MRPU of the tier that mix r gives slice l
+            ends = np.cumsum(block[s:s + rows], axis=1)
+            slice_mrpu = tiers[(np.arange(m)[None, :, None] >= ends[:, None, :]).sum(axis=2)]
+            slices = rng.multinomial(N_new, np.full(m, 1.0 / m), size=iters)
+            totals = slices @ slice_mrpu.T  # (iters, mixes)
+            prob[s:s + rows] = gap_ok(totals, gap_mrr, tol).mean(axis=0)
+            mrpu[s:s + rows] = totals.mean(axis=0) / N_new
+        for k in range(K):
+            np.maximum.at(marginals[k], block[:, k], prob)
+        r = int(np.lexsort((-mrpu, -prob))[0])
+        if best is None or (prob[r], mrpu[r]) > (best["prob_gap"], best["mean_avg_mrpu"]):
+            best = {"fractions": [float(c) / m for c in block[r]],
+                    "prob_gap": float(prob[r]), "mean_avg_mrpu": float(mrpu[r])}
+        keep = prob >= min_prob
+        kept_pts.append(block[keep].astype(np.uint16))
+        kept_prob.append(prob[keep].astype(np.float32))
+        kept_mrpu.append(mrpu[keep].astype(np.float32))
+
+    return {
+        "recommended": best,
+        "points": np.concatenate(kept_pts),
+        "prob": np.concatenate(kept_prob),
+        "mean_mrpu": np.concatenate(kept_mrpu),
+        "marginals": marginals,
+        "levels": np.arange(m + 1) / m,
+        "K": K,
+        "n_cells": comb(m + K - 1, K - 1),
+        "N_new": N_new,
+        "tolPct": tol,
+    }
+
+
+def max_projection(res, k1=0, k2=1):
+    """
+    2-D view of a K-tier result for tiers (k1, k2): best kept prob_gap over the
+    other tiers, as {f1Vec, f2Vec, z} that renderTierMixHeatmap can draw.
+    """
+    levels = res["levels"]
+    m = len(levels) - 1
+    z = np.full((m + 1, m + 1), np.nan)
+    a, b = np.meshgrid(np.arange(m + 1), np.arange(m + 1))
+    z[a + b <= m] = 0.0
+    pts = res["points"]
+    np.fmax.at(z, (pts[:, k2].astype(np.int64), pts[:, k1].astype(np.int64)), res["prob"].astype(float))
+    return {"f1Vec": levels, "f2Vec": levels, "z": z}
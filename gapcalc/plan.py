@@ -0,0 +1,146 @@
+# Python port of computePlan() from the generated planner page.
+# Keep this in lock-step with the JS in gap_closure.py so that Python results
+# can be compared cell-for-cell with what the browser shows.
+
+import math
+
+
+def safe_float(v, fallback=0.0):
+    """parseFloat-like coercion: non-numeric or non-finite values give `fallback`."""
+    try:
+        n = float(v)
+    except (TypeError, ValueError):
+        return fallback
+    return n if math.isfinite(n) else fallback
+
+
+def js_round(x):
+    """Math.round semantics (half rounds towards +inf), not Python's banker's rounding."""
+    return int(math.floor(x + 0.5))
+
+
+def _clamp01(x):
+    return min(1.0, max(0.0, x))
+
+
+def compute_plan(p):
+    """Gap, funnel uplift and unit economics for one parameter dict (see `defaults`)."""
+    exit_arr = safe_float(p.get("exit_arr_2025"), 0)
+    target_arr = safe_float(p.get("target_exit_arr_2026"), 0)
+    gap_arr = max(0.0, target_arr - exit_arr)
+    gap_mrr = gap_arr / 12.0
+
+    med_mrpu = safe_float(p.get("median_mrpu"), 0)
+    med_n = max(0.0, safe_float(p.get("median_mrpu_customers"), 0))
+    max_mrpu = safe_float(p.get("max_mrpu"), 0)
+    max_n = max(0.0, safe_float(p.get("max_mrpu_customers"), 0))
+
+    total_cluster_cust = med_n + max_n
+    avg_new_mrpu = med_mrpu
+    if total_cluster_cust > 0:
+        avg_new_mrpu = (med_mrpu * med_n + max_mrpu * max_n) / total_cluster_cust
+
+    required_new_customers = gap_mrr / avg_new_mrpu if avg_new_mrpu > 0 else math.inf
+
+    reach0 = _clamp01(safe_float(p.get("reach_rate_present"), 0))
+    meet0 = _clamp01(safe_float(p.get("meeting_rate_present"), 0))
+    win0 = _clamp01(safe_float(p.get("win_rate_present"), 0))
+    ICP_2025 = max(0.0, safe_float(p.get("ICP_2025"), 0))
+    ICP_2026 = max(0.0, safe_float(p.get("ICP_2026"), 0))
+    ICP_current_2026 = max(0.0, safe_float(p.get("ICP_current_2026"), 0))
+
+    p_funnel0 = reach0 * meet0 * win0
+    expected_wins_2025_present = ICP_2025 * p_funnel0
+    expected_wins_2026_present_rates = ICP_2026 * p_funnel0
+
+    # Uplift weights from sliders
+    wr0 = max(0.0, safe_float(p.get("uplift_weight_reach"), 1))
+    wm0 = max(0.0, safe_float(p.get("uplift_weight_meet"), 1))
+    ww0 = max(0.0, safe_float(p.get("uplift_weight_win"), 1))
+    sum_w = wr0 + wm0 + ww0
+    if sum_w <= 0:
+        wr = wm = ww = 1 / 3
+    else:
+        wr, wm, ww = wr0 / sum_w, wm0 / sum_w, ww0 / sum_w
+
+    proposed_reach, proposed_meet, proposed_win = reach0, meet0, win0
+    uplift_factor = 1.0
+    enough_already = False
+
+    if expected_wins_2026_present_rates <= 0 or not math.isfinite(required_new_customers):
+        uplift_factor = math.nan
+    elif expected_wins_2026_present_rates >= required_new_customers:
+        uplift_factor = 1.0
+        enough_already = True
+    else:
+        s = required_new_customers / expected_wins_2026_present_rates
+        uplift_factor = s
+        cap = 0.95
+        proposed_reach = min(cap, reach0 * s ** wr)
+        proposed_meet = min(cap, meet0 * s ** wm)
+        proposed_win = min(cap, win0 * s ** ww)
+
+    proposed_funnel_prob = proposed_reach * proposed_meet * proposed_win
+    expected_wins_2026_proposed = ICP_2026 * proposed_funnel_prob
+
+    # Unit economics & NDR on new customers
+    gm_2026 = max(0.0, safe_float(p.get("gm_2026_anticipated"), 0))
+    gm_2025 = max(0.0, safe_float(p.get("gm_2025"), 0))
+    ndr_target = max(0.0, safe_float(p.get("ndr_target"), 1.0))
+
+    lifetime_years = max(0.0, safe_float(p.get("ideal_customer_lifetime_years"), 0))
+    lifetime_months = lifetime_years * 12.0
+
+    payback_months_2026 = max(0.0, safe_float(p.get("payback_months"), 0))
+    payback_months_2025 = max(0.0, safe_float(p.get("payback_months_2025"), 0))
+
+    new_cust_mrr_2026 = 0.0
+    if math.isfinite(required_new_customers) and math.isfinite(avg_new_mrpu):
+        new_cust_mrr_2026 = required_new_customers * avg_new_mrpu
+
+    additional_mrr_ndr_new = 0.0
+    if ndr_target > 1 and math.isfinite(new_cust_mrr_2026):
+        additional_mrr_ndr_new = new_cust_mrr_2026 * (ndr_target - 1)
+
+    gross_profit_mrr_per_cust = avg_new_mrpu * gm_2026
+
+    ltv_per_customer = 0.0
+    if math.isfinite(gross_profit_mrr_per_cust) and lifetime_months > 0:
+        ltv_per_customer = gross_profit_mrr_per_cust * lifetime_months
+
+    expected_cac = 0.0
+    if math.isfinite(gross_profit_mrr_per_cust) and payback_months_2026 > 0:
+        expected_cac = gross_profit_mrr_per_cust * payback_months_2026
+
+    return {
+        "gap_arr": gap_arr,
+        "gap_mrr": gap_mrr,
+        "avg_new_mrpu": avg_new_mrpu,
+        "required_new_customers": required_new_customers,
+        "reach0": reach0, "meet0": meet0, "win0": win0,
+        "expected_wins_2025_present": expected_wins_2025_present,
+        "expected_wins_2026_present_rates": expected_wins_2026_present_rates,
+        "proposed_reach": proposed_reach,
+        "proposed_meet": proposed_meet,
+        "proposed_win": proposed_win,
+        "uplift_factor": uplift_factor,
+        "enough_already": enough_already,
+        "expected_wins_2026_proposed": expected_wins_2026_proposed,
+        "ICP_2025": ICP_2025,
+        "ICP_2026": ICP_2026,
+        "ICP_current_2026": ICP_current_2026,
+        "wr": wr, "wm": wm, "ww": ww,
+        "wr0": wr0, "wm0": wm0, "ww0": ww0,
+        "gm_2025": gm_2025,
+        "gm_2026": gm_2026,
+        "ndr_target": ndr_target,
+        "lifetime_years": lifetime_years,
+        "lifetime_months": lifetime_months,
+        "payback_months_2025": payback_months_2025,
+        "payback_months_2026": payback_months_2026,
+        "new_cust_mrr_2026": new_cust_mrr_2026,
+        "additional_mrr_ndr_new": additional_mrr_ndr_new,
+        "gross_profit_mrr_per_cust": gross_profit_mrr_per_cust,
+        "ltv_per_customer": ltv_per_customer,
+        "expected_cac": expected_cac,
+    }
@@ -0,0 +1,147 @@
+# Vectorized computePlan(): one NumPy pass over columns of planning scenarios.
+# Branch-for-branch equivalent to plan.compute_plan, including the NaN / Infinity
+# cases, so compute_plan_batch(cols)[k][n] == compute_plan(row n)[k].
+
+import numpy as np
+
+
+def as_columns(cols):
+    """Accept a dict-like of columns or a NumPy structured (record) array."""
+    if isinstance(cols, np.ndarray) and cols.dtype.names:
+        return {k: cols[k] for k in cols.dtype.names}
+    return cols
+
+
+def safe_column(cols, key, fallback):
+    """safe_float() per element of column `key`: missing, non-numeric or non-finite -> fallback."""
+    v = cols.get(key) if hasattr(cols, "get") else None
+    if v is None:
+        return np.float64(fallback)
+    a = np.asarray(v, dtype=float)
+    return np.where(np.isfinite(a), a, fallback)
+
+
+def compute_plan_batch(cols):
+    """
+    Evaluate computePlan for many scenarios at once.
+
+    `cols` maps `defaults` keys to scalars or 1-D arrays (broadcast against each
+    other) or is a structured array with those field names. Returns a dict with
+    the same 35 keys as compute_plan(), each an array of the broadcast shape.
+    """
+    c = as_columns(cols)
+    exit_arr = safe_column(c, "exit_arr_2025", 0)
+    target_arr = safe_column(c, "target_exit_arr_2026", 0)
+    med_mrpu = safe_column(c, "median_mrpu", 0)
+    med_n = np.maximum(0, safe_column(c, "median_mrpu_customers", 0))
+    max_mrpu = safe_column(c, "max_mrpu", 0)
+    max_n = np.maximum(0, safe_column(c, "max_mrpu_customers", 0))
+    reach0 = np.clip(safe_column(c, "reach_rate_present", 0), 0, 1)
+    meet0 = np.clip(safe_column(c, "meeting_rate_present", 0), 0, 1)
+    win0 = np.clip(safe_column(c, "win_rate_present", 0), 0, 1)
+    ICP_2025 = np.maximum(0, safe_column(c, "ICP_2025", 0))
+    ICP_2026 = np.maximum(0, safe_column(c, "ICP_2026", 0))
+    ICP_current_2026 = np.maximum(0, safe_column(c, "ICP_current_2026", 0))
+    wr0 = np.maximum(0, safe_column(c, "uplift_weight_reach", 1))
+    wm0 = np.maximum(0, safe_column(c, "uplift_weight_meet", 1))
+    ww0 = np.maximum(0, safe_column(c, "uplift_weight_win", 1))
+    gm_2026 = np.maximum(0, safe_column(c, "gm_2026_anticipated", 0))
+    gm_2025 = np.maximum(0, safe_column(c, "gm_2025", 0))
+    ndr_target = np.maximum(0, safe_column(c, "ndr_target", 1.0))
+    lifetime_years = np.maximum(0, safe_column(c, "ideal_customer_lifetime_years", 0))
+    payback_months_2026 = np.maximum(0, safe_column(c, "payback_months", 0))
+    payback_months_2025 = np.maximum(0, safe_column(c, "payback_months_2025", 0))
+
+    (exit_arr, target_arr, med_mrpu, med_n, max_mrpu, max_n, reach0, meet0, win0,
+     ICP_2025, ICP_2026, ICP_current_2026, wr0, wm0, ww0, gm_2026, gm_2025,
+     ndr_target, lifetime_years, payback_months_2026, payback_months_2025) = np.broadcast_arrays(
+        exit_arr, target_arr, med_mrpu, med_n, max_mrpu, max_n, reach0, meet0, win0,
+        ICP_2025, ICP_2026, ICP_current_2026, wr0, wm0, ww0, gm_2026, gm_2025,
+        ndr_target, lifetime_years, payback_months_2026, payback_months_2025)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        gap_arr = np.maximum(0, target_arr - exit_arr)
+        gap_mrr = gap_arr / 12.0
+
+        total_cluster_cust = med_n + max_n
+        avg_new_mrpu = np.where(
+            total_cluster_cust > 0,
+            (med_mrpu * med_n + max_mrpu * max_n) / total_cluster_cust,
+            med_mrpu)
+        required_new_customers = np.where(avg_new_mrpu > 0, gap_mrr / avg_new_mrpu, np.inf)
+
+        p_funnel0 = reach0 * meet0 * win0
+        expected_wins_2025_present = ICP_2025 * p_funnel0
+        expected_wins_2026_present_rates = ICP_2026 * p_funnel0
+
+        # Uplift weights from sliders
+        sum_w = wr0 + wm0 + ww0
+        no_w = sum_w <= 0
+        wr = np.where(no_w, 1 / 3, wr0 / sum_w)
+        wm = np.where(no_w, 1 / 3, wm0 / sum_w)
+        ww = np.where(no_w, 1 / 3, ww0 / sum_w)
+
+        # Same three branches as the scalar if / else-if / else
+        invalid = (expected_wins_2026_present_rates <= 0) | ~np.isfinite(required_new_customers)
+        enough_already = ~invalid & (expected_wins_2026_present_rates >= required_new_customers)
+        uplift = ~invalid & ~enough_already
+
+        s = required_new_customers / expected_wins_2026_present_rates
+        uplift_factor = np.where(invalid, np.nan, np.where(enough_already, 1.0, s))
+        cap = 0.95
+        proposed_reach = np.where(uplift, np.minimum(cap, reach0 * np.power(s, wr)), reach0)
+        proposed_meet = np.where(uplift, np.minimum(cap, meet0 * np.power(s, wm)), meet0)
+        proposed_win = np.where(uplift, np.minimum(cap, win0 * np.power(s, ww)), win0)
+
+        proposed_funnel_prob = proposed_reach * proposed_meet * proposed_win
+        expected_wins_2026_proposed = ICP_2026 * proposed_funnel_prob
+
+        # Unit economics & NDR on new customers
+        lifetime_months = lifetime_years * 12.0
+
+        new_cust_mrr_2026 = np.where(
+            np.isfinite(required_new_customers) & np.isfinite(avg_new_mrpu),
+            required_new_customers * avg_new_mrpu, 0.0)
+        additional_mrr_ndr_new = np.where(
+            (ndr_target > 1) & np.isfinite(new_cust_mrr_2026),
+            new_cust_mrr_2026 * (ndr_target - 1), 0.0)
+
+        gross_profit_mrr_per_cust = avg_new_mrpu * gm_2026
+        gp_ok = np.isfinite(gross_profit_mrr_per_cust)
+        ltv_per_customer = np.where(
+            gp_ok & (lifetime_months > 0), gross_profit_mrr_per_cust * lifetime_months, 0.0)
+        expected_cac = np.where(
+            gp_ok & (payback_months_2026 > 0), gross_profit_mrr_per_cust * payback_months_2026, 0.0)
+
+    return {
+        "gap_arr": gap_arr,
+        "gap_mrr": gap_mrr,
+        "avg_new_mrpu": avg_new_mrpu,
+        "required_new_customers": required_new_customers,
+        "reach0": reach0, "meet0": meet0, "win0": win0,
+        "expected_wins_2025_present": expected_wins_2025_present,
+        "expected_wins_2026_present_rates": expected_wins_2026_present_rates,
+        "proposed_reach": proposed_reach,
+        "proposed_meet": proposed_meet,
+        "proposed_win": proposed_win,
+        "uplift_factor": uplift_factor,
+        "enough_already": enough_already,
+        "expected_wins_2026_proposed": expected_wins_2026_proposed,
+        "ICP_2025": ICP_2025,
+        "ICP_2026": ICP_2026,
+        "ICP_current_2026": ICP_current_2026,
+        "wr": wr, "wm": wm, "ww": ww,
+        "wr0": wr0, "wm0": wm0, "ww0": ww0,
+        "gm_2025": gm_2025,
+        "gm_2026": gm_2026,
+        "ndr_target": ndr_target,
+        "lifetime_years": lifetime_years,
+        "lifetime_months": lifetime_months,
+        "payback_months_2025": payback_months_2025,
+        "payback_months_2026": payback_months_2026,
+        "new_cust_mrr_2026": new_cust_mrr_2026,
+        "additional_mrr_ndr_new": additional_mrr_ndr_new,
+        "gross_profit_mrr_per_cust": gross_profit_mrr_per_cust,
+        "ltv_per_customer": ltv_per_customer,
+        "expected_cac": expected_cac,
+    }
@@ -0,0 +1,116 @@
+# "Find best mix" mode: race the tier-mix grid cells instead of running every
+# cell to completion. All cells get a small first batch; each round drops the
+# cells whose Wilson upper bound is below the leader's lower bound and doubles
+# the per-cell batch for the survivors, until the draw budget is spent or one
+# cell is left.
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from .tier_mix import cell_rng, grid_cells, sample_cell, simplex_axis, tier_inputs
+
+
+def wilson_bounds(hits, n, z):
+    """Vectorized Wilson score interval (lo, hi) for hits / n."""
+    p = hits / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z / denom * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+    return center - half, center + half
+
+
+def _is_better(a, b, prob, mrpu):
+    return prob[a] > prob[b] or (prob[a] == prob[b] and mrpu[a] > mrpu[b])
+
+
+def _ranked(idx, prob, mrpu):
+    # Highest prob_gap first, ties by mean_avg_mrpu, then grid order
+    return sorted(idx, key=lambda k: (-prob[k], -mrpu[k], k))
+
+
+def find_best_mix(p, plan, seed=None, budget=None, initial=200, confidence=0.95):
+    """
+    Recommended tier mix by racing grid cells, without the full heatmap.
+
+    `budget` is the total number of simulated iterations across all cells and
+    defaults to a fifth of what the full grid would draw at mc_tier_iterations.
+    Returns {recommended, runner_up, confidence, survivors, rounds,
+    total_iterations, N_new, tolPct}; `confidence` is the normal-approximation
+    probability that the winner's prob_gap exceeds the runner-up's.
+    """
+    N_new, tiers, gap_mrr, tol, iters = tier_inputs(p, plan)
+    if N_new <= 0:
+        return {"recommended": None, "runner_up": None, "confidence": None, "survivors": 0,
+                "rounds": 0, "total_iterations": 0, "N_new": 0, "tolPct": 0}
+
+    cells = list(grid_cells(simplex_axis(), simplex_axis()))
+    if budget is None:
+        budget = len(cells) * iters // 5
+    entropy = np.random.SeedSequence(seed).entropy
+    rngs = [cell_rng(entropy, j, i) for j, i, _, _, _ in cells]
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    hits = np.zeros(len(cells))
+    n = np.zeros(len(cells))
+    mrr = np.zeros(len(cells))
+    alive = list(range(len(cells)))
+    size = max(1, int(initial))
+    spent = 0
+    rounds = 0
+
+    while alive and spent < budget:
+        size = min(size, max(1, (budget - spent) // len(alive)))
+        for k in alive:
+            _, _, f1, f2, f3 = cells[k]
+            h, m = sample_cell(rngs[k], N_new, tiers, gap_mrr, tol, size, f1, f2, f3)
+            hits[k] += h
+            mrr[k] += m
+            n[k] += size
+        spent += size * len(alive)
+        rounds += 1
+
+        prob = hits / np.maximum(n, 1)
+        mrpu = mrr / np.maximum(n, 1) / N_new
+        lo, hi = wilson_bounds(hits[alive], n[alive], z)
+        leader = alive[0]
+        for k in alive[1:]:
+            if _is_better(k, leader, prob, mrpu):
+                leader = k
+        leader_lo = lo[alive.index(leader)]
+        alive = [k for k, h_k in zip(alive, hi) if h_k >= leader_lo]
+        if len(alive) <= 1:
+            break
+        size *= 2
+
+    prob = hits / np.maximum(n, 1)
+    mrpu = mrr / np.maximum(n, 1) / N_new
+    order = _ranked(alive, prob, mrpu)
+    winner = order[0]
+    rest = _ranked([k for k in range(len(cells)) if k != winner], prob, mrpu)
+    runner = rest[0] if rest else None
+
+    def describe(k):
+        _, _, f1, f2, f3 = cells[k]
+        return {"f1": f1, "f2": f2, "f3": f3,
+                "prob_gap": float(prob[k]), "mean_avg_mrpu": float(mrpu[k]),
+                "stderr": math.sqrt(prob[k] * (1 - prob[k]) / n[k]), "iterations": int(n[k])}
+
+    conf = 1.0
+    if runner is not None:
+        se = math.sqrt(prob[winner] * (1 - prob[winner]) / n[winner]
+                       + prob[runner] * (1 - prob[runner]) / n[runner])
+        diff = prob[winner] - prob[runner]
+        conf = NormalDist().cdf(diff / se) if se > 0 else (1.0 if diff > 0 else 0.5)
+
+    return {
+        "recommended": describe(winner),
+        "runner_up": describe(runner) if runner is not None else None,
+        "confidence": conf,
+        "survivors": len(alive),
+        "rounds": rounds,
+        "total_iterations": int(n.sum()),
+        "N_new": N_new,
+        "tolPct": tol,
+    }
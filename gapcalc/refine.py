@@ -0,0 +1,97 @@
+# Coarse-to-fine tier-mix search. The simplex is triangulated at coarse_step;
+# each level evaluates the triangle vertices and halves only the triangles that
+# touch the high-probability region (max vertex >= top_frac * best so far) or
+# straddle a steep prob_gap boundary (vertex spread > spread). Points live on an
+# integer lattice of resolution R, so shared vertices are evaluated once.
+
+import math
+
+import numpy as np
+
+from .plan import js_round
+from .tier_mix import cell_evaluator, cell_rng, engine_spec, tier_inputs
+
+
+def _up(a, b, s):
+    return ((a, b), (a + s, b), (a, b + s))
+
+
+def _down(a, b, s):
+    return ((a + s, b), (a, b + s), (a + s, b + s))
+
+
+def _children(tri):
+    a, b, s, up = tri
+    h = s // 2
+    if up:
+        return [(a, b, h, True), (a + h, b, h, True), (a, b + h, h, True), (a, b, h, False)]
+    return [(a + h, b, h, False), (a, b + h, h, False), (a + h, b + h, h, False), (a + h, b + h, h, True)]
+
+
+def refine_tier_mix(p, plan, mode="exact", coarse_step=0.1, min_step=0.005,
+                    top_frac=0.9, spread=0.2, seed=None, **engine_opts):
+    """
+    Adaptive-mesh tier-mix search down to (at least) `min_step` resolution.
+
+    coarse_step must be 1/m for an integer m; the finest step actually used is
+    coarse_step / 2**k, the first halving at or below min_step. Returns
+    {recommended, heatmap: {f1, f2, z, stderr, iterations, scattered: True},
+    step, N_new, tolPct}, with one entry per evaluated mix. `mode` and
+    `engine_opts` are as for tier_mix_monte_carlo.
+    """
+    N_new, tiers, gap_mrr, tol, iters = tier_inputs(p, plan)
+    if N_new <= 0:
+        return {"recommended": None, "heatmap": None, "step": None, "N_new": 0, "tolPct": 0}
+
+    m = js_round(1.0 / coarse_step)
+    levels = max(0, math.ceil(math.log2(coarse_step / min_step) - 1e-9))
+    side = 2 ** levels
+    R = m * side
+
+    entropy = np.random.SeedSequence(seed).entropy
+    cell = cell_evaluator(engine_spec(mode, N_new, tiers, gap_mrr, tol, iters, entropy=entropy, **engine_opts))
+    values = {}
+
+    def value(pt):
+        if pt not in values:
+            a, b = pt
+            f1, f2 = a / R, b / R
+            rng = None if mode == "exact" else cell_rng(entropy, a, b)  # unused by shared samplers
+            values[pt] = cell(rng, f1, f2, max(0.0, 1.0 - f1 - f2))
+        return values[pt][0]
+
+    tris = []
+    for a in range(0, R, side):
+        for b in range(0, R - a, side):
+            tris.append((a, b, side, True))
+            if a + b + 2 * side <= R:
+                tris.append((a, b, side, False))
+
+    while tris:
+        vert_probs = [[value(v) for v in (_up if up else _down)(a, b, s)] for a, b, s, up in tris]
+        best = max(v[0] for v in values.values())
+        nxt = []
+        for tri, probs in zip(tris, vert_probs):
+            if tri[2] > 1 and (max(probs) >= top_frac * best or max(probs) - min(probs) > spread):
+                nxt.extend(_children(tri))
+        tris = nxt
+
+    pts = sorted(values, key=lambda pt: (pt[1], pt[0]))  # f2-major, like the grid scan
+    z = np.array([values[pt][0] for pt in pts])
+    mrpu = np.array([values[pt][1] for pt in pts])
+    f1 = np.array([pt[0] / R for pt in pts])
+    f2 = np.array([pt[1] / R for pt in pts])
+
+    k = max(range(len(pts)), key=lambda n: (z[n], mrpu[n], -n))
+    recommended = {"f1": float(f1[k]), "f2": float(f2[k]), "f3": max(0.0, 1.0 - float(f1[k]) - float(f2[k])),
+                   "prob_gap": float(z[k]), "mean_avg_mrpu": float(mrpu[k])}
+    return {
+        "recommended": recommended,
+        "heatmap": {"f1": f1, "f2": f2, "z": z,
+                    "stderr": np.array([values[pt][2] for pt in pts]),
+                    "iterations": np.array([values[pt][3] for pt in pts], dtype=np.int64),
+                    "scattered": True},
+        "step": 1.0 / R,
+        "N_new": N_new,
+        "tolPct": tol,
+    }
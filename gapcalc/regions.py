@@ -0,0 +1,204 @@
+# Batch generation of planner pages for many regions / what-if variants.
+#
+#   python -m gapcalc.regions variants.json out_dir [--workers N]
+#
+# variants.json is either {"IN": {...overrides}, "DE": {...}} or a list of
+# {"name": "IN", "region": "IN", "params": {...overrides}}; overrides are applied
+# on top of DEFAULTS (or the file's optional top-level "base" when it is a dict
+# with "variants"). Pages are rendered on a process pool with precomputed plans
+# and heatmaps. A variant whose inputs, template and engine version hash to
+# the same value as last time is not recomputed. A page whose rendered bytes
+# are unchanged is not rewritten. out_dir/index.html links every page.
+
+import argparse
+import hashlib
+import html as html_lib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import ENGINE_VERSION
+from .defaults import DEFAULTS
+from .render import read_template, render_html
+
+MANIFEST = ".planner_hashes.json"
+
+
+def load_variants(path):
+    """[(name, region, params)] from a variants file (see module docstring)."""
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    base = dict(DEFAULTS)
+    if isinstance(spec, dict) and "variants" in spec:
+        base.update(spec.get("base", {}))
+        spec = spec["variants"]
+    if isinstance(spec, dict):
+        spec = [{"name": name, "params": params} for name, params in spec.items()]
+    out = []
+    for entry in spec:
+        name = str(entry["name"])
+        out.append((name, str(entry.get("region", name)), dict(base, **entry.get("params", {}))))
+    names = [name for name, _, _ in out]
+    if len(set(names)) != len(names):
+        raise ValueError("variant names must be unique")
+    return out
+
+
+def page_filename(name):
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") + ".html"
+
+
+def _check_filenames(names):
+    # Distinct names can still sanitize to the same page (or to index.html), and
+    # pages differing only in case collide on case-insensitive file systems.
+    seen = {"index.html": "the index page"}
+    for name in names:
+        filename = page_filename(name)
+        if filename == ".html":
+            raise ValueError("variant name %r has no usable characters for a filename" % name)
+        if filename.lower() in seen:
+            raise ValueError("variant %r and %s would both be written to %s"
+                             % (name, seen[filename.lower()], filename))
+        seen[filename.lower()] = "variant %r" % name
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _render_one(job):
+    # Runs in a worker process: compute, render, and write only if the bytes changed
+    name, region, params, path = job
+    from .embed import precompute_payload
+
+    payload = precompute_payload(params)
+    page = render_html(params, payload, region)
+    digest = _sha256(page)
+    wrote = True
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            wrote = _sha256(f.read()) != digest
+    if wrote:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(page)
+        os.replace(tmp, path)
+
+    plan, rec = payload["plan"], payload["tier"]["recommended"]
+    summary = {
+        "gap_arr": plan["gap_arr"],
+        "required_new_customers": plan["required_new_customers"],
+        "mix": [rec["f1"], rec["f2"], rec["f3"]] if rec else None,
+        "prob_gap": rec["prob_gap"] if rec else None,
+    }
+    return name, digest, summary, wrote
+
+
+def _fmt(x, spec):
+    return "—" if x is None or x != x or x in (float("inf"), float("-inf")) else format(x, spec)
+
+
+def write_index(out_dir, rows):
+    items = []
+    for name, region, filename, s in rows:
+        mix = " / ".join("%.0f%%" % (100 * f) for f in s["mix"]) if s["mix"] else "—"
+        items.append(
+            "<tr><td><a href=\"%s\">%s</a></td><td>%s</td><td>€%s</td><td>%s</td><td>%s</td><td>%s</td></tr>" % (
+                html_lib.escape(filename), html_lib.escape(name), html_lib.escape(region),
+                _fmt(s["gap_arr"], ",.0f"), _fmt(s["required_new_customers"], ".1f"), mix,
+                "—" if s["prob_gap"] is None else _fmt(100 * s["prob_gap"], ".1f") + "%"))
+    page = """<!doctype html>
+<html>
+<head>
+  <meta charset="utf-8" />
+  <title>D.OS gap-closure planners</title>
+  <style>
+    body { font-family: Arial, Helvetica, sans-serif; margin: 14px; color: #0f172a; }
+    table { border-collapse: collapse; font-size: 13px; }
+    th, td { border-bottom: 1px solid #e5e7eb; padding: 6px 10px; text-align: right; }
+    th:first-child, td:first-child, th:nth-child(2), td:nth-child(2) { text-align: left; }
+  </style>
+</head>
+<body>
+  <h2>D.OS gap-closure planners</h2>
+  <table>
+    <tr><th>Variant</th><th>Region</th><th>Gap ARR</th><th>Required new customers</th><th>Tier mix (1 / 2 / 3)</th><th>P(close gap)</th></tr>
+    %s
+  </table>
+</body>
+</html>
+""" % "\n    ".join(items)
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(page)
+
+
+def render_regions(variants, out_dir, workers=None):
+    """
+    Render one planner page per (name, region, params) into `out_dir` plus an
+    index.html. Raises ValueError if two names map to the same page filename. Returns {"rendered": [...], "unchanged": [...], "skipped": [...]}.
+    "skipped" pages were not recomputed at all because their input hash matched.
+    """
+    _check_filenames([name for name, _, _ in variants])
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    template_hash = _sha256(read_template())
+    jobs, rows, result = [], [], {"rendered": [], "unchanged": [], "skipped": []}
+    input_hashes = {}
+    for name, region, params in variants:
+        filename = page_filename(name)
+        path = os.path.join(out_dir, filename)
+        key = _sha256(json.dumps([region, params, template_hash, ENGINE_VERSION], sort_keys=True))
+        input_hashes[name] = key
+        prev = manifest.get(name)
+        if prev and prev["input"] == key and os.path.exists(path):
+            result["skipped"].append(name)
+        else:
+            jobs.append((name, region, params, path))
+        rows.append((name, region, filename))
+
+    n = min(len(jobs), workers if workers and workers > 0 else (os.cpu_count() or 1))
+    if n <= 1:
+        done = [_render_one(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=n) as pool:
+            done = list(pool.map(_render_one, jobs))
+
+    for name, digest, summary, wrote in done:
+        manifest[name] = {"input": input_hashes[name], "content": digest, "summary": summary}
+        result["rendered" if wrote else "unchanged"].append(name)
+
+    names = {name for name, _, _ in rows}
+    manifest = {name: entry for name, entry in manifest.items() if name in names}
+    write_index(out_dir, [(name, region, filename, manifest[name]["summary"])
+                          for name, region, filename in rows])
+    tmp = manifest_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, manifest_path)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gapcalc.regions",
+                                     description="Render planner pages for many regions / variants.")
+    parser.add_argument("variants", help="JSON file of per-region / per-variant parameter overrides")
+    parser.add_argument("out_dir")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    args = parser.parse_args(argv)
+    result = render_regions(load_variants(args.variants), args.out_dir, workers=args.workers)
+    print("Rendered %d, unchanged %d, skipped %d -> %s" % (
+        len(result["rendered"]), len(result["unchanged"]), len(result["skipped"]),
+        os.path.join(os.path.abspath(args.out_dir), "index.html")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
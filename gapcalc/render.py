@@ -0,0 +1,90 @@
+# Planner page generation. The page template lives in planner.html next to this
+# module and is only read when a page is rendered.
+
+import html as html_lib
+import json
+import os
+import sys
+
+from .defaults import DEFAULTS
+from .incremental import JOINT_PLAN_KEYS, STAGE_DEPS
+from .timing import recording, stage
+
+TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "planner.html")
+DEFAULT_OUTFILE = "dos_gap_closure_planner.html"
+DEFAULT_REGION = "IN"
+
+
+def read_template():
+    with open(TEMPLATE, encoding="utf-8") as f:
+        return f.read()
+
+
+def render_html(defaults, precomputed=None, region=DEFAULT_REGION, service_url=""):
+    """
+    Fill the template with `defaults`, an embed.precompute_payload() result (or
+    None), the region label and the default compute-service URL ("" = browser).
+    """
+    page = read_template()
+    page = page.replace("REPLACE_REGION_HERE", html_lib.escape(str(region)))
+    page = page.replace("REPLACE_DEFAULTS_HERE", json.dumps(defaults, indent=2))
+    page = page.replace("REPLACE_PRECOMPUTED_HERE", json.dumps(precomputed, separators=(",", ":")))
+    page = page.replace("REPLACE_STAGE_DEPS_HERE", json.dumps(STAGE_DEPS))
+    page = page.replace("REPLACE_JOINT_PLAN_KEYS_HERE", json.dumps(JOINT_PLAN_KEYS))
+    page = page.replace("REPLACE_SERVICE_URL_HERE", json.dumps(service_url))
+    return page
+
+
+def render_planner(defaults=None, path=None, precompute=True, region=DEFAULT_REGION, service_url="",
+                   refine=None):
+    """
+    HTML for the planner page with `defaults` (DEFAULTS if omitted) as inputs.
+
+    With precompute=True the default plan and an exact tier-mix heatmap are
+    embedded so the page renders without running the browser Monte Carlo.
+    service_url pre-fills the page's compute-service box (python -m gapcalc.service).
+    refine embeds refine_tier_mix()'s adaptive mesh instead (see embed.precompute_payload).
+    Writes the page to `path` when given; always returns the HTML string.
+    """
+    defaults = dict(DEFAULTS if defaults is None else defaults)
+    precomputed = None
+    if precompute:
+        from .embed import precompute_payload  # numpy, only needed here
+
+        with stage("precompute_payload"):
+            precomputed = precompute_payload(defaults, refine=refine)
+
+    with stage("render_html"):
+        page = render_html(defaults, precomputed, region, service_url)
+    if path is not None:
+        with stage("write_page", bytes=len(page)), open(path, "w", encoding="utf-8") as f:
+            f.write(page)
+    return page
+
+
+def main(argv=None, defaults=None):
+    """
+    `python -m gapcalc [OUTFILE] [--trace TRACE.json] [--refine]`: write the planner page
+    (default dos_gap_closure_planner.html), optionally with a Chrome trace of the build.
+    --refine embeds the adaptive-mesh tier-mix search instead of the grid heatmap.
+    """
+    argv = list(sys.argv[1:] if argv is None else argv)
+    refine = "--refine" in argv
+    if refine:
+        argv.remove("--refine")
+    trace = None
+    if "--trace" in argv:
+        k = argv.index("--trace")
+        trace = argv[k + 1] if k + 1 < len(argv) else "planner_trace.json"
+        del argv[k:k + 2]
+    outfile = argv[0] if argv else DEFAULT_OUTFILE
+    with recording() as rec:
+        render_planner(defaults, path=outfile, refine=refine)
+    if trace:
+        rec.dump(trace)
+        print("Timings:", ", ".join("%s %.1f ms" % (name, 1000 * s["total_s"])
+                                    for name, s in rec.summary().items()))
+        print("Wrote:", os.path.abspath(trace))
+    print("Wrote:", os.path.abspath(outfile))
+    print("Open %s in your browser." % os.path.basename(outfile))
+    return 0
@@ -0,0 +1,324 @@
+# Local HTTP compute service around the Python engine, so several planner pages
+# can share one warm, cached, multi-core backend:
+#
+#   python -m gapcalc.service [--host 127.0.0.1] [--port 8765] [--workers N] [--cache-dir DIR]
+#
+# Endpoints (JSON bodies, CORS open so a file:// page can call it):
+#   GET  /health            workers, in-flight runs and cache stats
+#   POST /plan              {"params": {...}} -> computePlan() result
+#   POST /tier-mix          {"params": {...}, "seed", "mode", "sampler", ...} -> tierMixMonteCarlo() result
+#   POST /tier-mix/stream   same body; newline-delimited JSON: a header line, one
+#                           {"j", "row", "best"} line per heatmap row as it completes,
+#                           then {"done": true, "recommended", ...}
+#
+# params are applied on top of DEFAULTS. Heatmap rows are evaluated on a process
+# pool with the same per-cell RNG streams as tier_mix_monte_carlo(), so results
+# match it for the same seed. Identical requests in flight share one run, and
+# seeded / exact / joint results go through a ResultCache. NaN is sent as null.
+
+import argparse
+import asyncio
+import functools
+import json
+import math
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .cache import ResultCache
+from .defaults import DEFAULTS
+from .funnel import beta_params, wins_pmf
+from .tier_mix import (_eval_band, engine_spec, grid_result, grid_start, grid_store, recommend,
+                       simplex_axis, tier_inputs)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY = 2 ** 20
+TIER_OPTIONS = ("mode", "sampler", "half_width", "batch", "confidence", "max_error", "fallback",
+                "funnel")
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Methods": "GET, POST, OPTIONS",
+    "Access-Control-Allow-Headers": "Content-Type",
+    "Access-Control-Allow-Private-Network": "true",
+}
+
+
+def jsonable(obj):
+    """numpy arrays / scalars to lists / floats, NaN and +-inf to None."""
+    if isinstance(obj, dict):
+        return {k: jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, np.ndarray)):
+        return [jsonable(v) for v in obj]
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, (float, np.floating)):
+        return float(obj) if math.isfinite(obj) else None
+    return obj
+
+
+def _line(obj):
+    return (json.dumps(jsonable(obj), separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _row_messages(result):
+    # Rows of a finished (cached) result; the final message carries the recommendation
+    return [{"j": j, "row": row, "best": None} for j, row in enumerate(result["heatmap"]["z"])]
+
+
+class TierRun:
+    """One tier-mix computation that any number of requests can follow."""
+
+    def __init__(self, header):
+        self.header = header
+        self.rows = []
+        self.final = None
+        self.result = None
+        self._cond = asyncio.Condition()
+
+    async def add(self, msg, final=False):
+        async with self._cond:
+            if final:
+                self.final = msg
+            else:
+                self.rows.append(msg)
+            self._cond.notify_all()
+
+    async def messages(self):
+        """Header, every row (already finished ones first), then the final message."""
+        yield self.header
+        k = 0
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda: k < len(self.rows) or self.final is not None)
+                pending, final = self.rows[k:], self.final
+            for msg in pending:
+                yield msg
+            k += len(pending)
+            if final is not None and k == len(self.rows):
+                yield final
+                return
+
+
+class ComputeService:
+    """Request handling for the HTTP endpoints; run it with serve()."""
+
+    def __init__(self, workers=None, cache=None):
+        self.workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        # Not fork: forked workers would inherit (and hold open) client sockets
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self.pool = ProcessPoolExecutor(max_workers=self.workers,
+                                        mp_context=multiprocessing.get_context(method))
+        self.cache = cache if cache is not None else ResultCache()
+        self.inflight = {}
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+    @staticmethod
+    def params(body):
+        params = body.get("params", {})
+        if not isinstance(params, dict):
+            raise ValueError("params must be an object")
+        return dict(DEFAULTS, **params)
+
+    def plan(self, body):
+        return self.cache.plan(self.params(body))
+
+    def tier_run(self, body):
+        """The TierRun for this request: a cached result, a run in flight, or a new run."""
+        p = self.params(body)
+        plan = self.cache.plan(p)
+        seed = body.get("seed")
+        opts = {k: body[k] for k in TIER_OPTIONS if body.get(k) is not None}
+        N_new, _, _, tol, _ = tier_inputs(p, plan)
+        entropy = np.random.SeedSequence(seed).entropy
+        funnel = opts.get("funnel", "proposed")
+        if opts.get("mode") == "joint":
+            # The wins PMF can take seconds, so it is built in _compute(), off the event
+            # loop and only on a cache miss; bad funnel rates still fail the request here
+            beta_params(p, plan, funnel)
+            spec = functools.partial(self._spec, p, plan, entropy, opts)
+        else:
+            spec = self._spec(p, plan, entropy, opts)
+
+        # Keyed on the raw inputs (see ResultCache.tier_mix_key), so no PMF is needed for it
+        key = self.cache.tier_mix_key(p, plan, seed, **opts)
+        # Unseeded runs are not cached, but identical ones in flight can still share a draw
+        run_key = key or self.cache.tier_mix_key(p, plan, "unseeded", **opts)
+        if run_key in self.inflight:
+            return self.inflight[run_key]
+
+        f1Vec, f2Vec = simplex_axis(), simplex_axis()
+        header = {"f1Vec": f1Vec, "f2Vec": f2Vec, "N_new": N_new, "tolPct": tol if N_new > 0 else 0}
+        run = TierRun(header)
+        cached = self.cache.get(key) if key else None
+        if N_new <= 0 or cached is not None:
+            result = cached or {"recommended": None, "heatmap": None, "N_new": 0, "tolPct": 0}
+            run.result = result
+            run.rows = _row_messages(result) if result["heatmap"] is not None else []
+            run.final = {"done": True, "recommended": result["recommended"], "cached": cached is not None}
+            return run
+
+        self.inflight[run_key] = run
+        task = asyncio.get_running_loop().create_task(
+            self._compute(run, spec, entropy, key, funnel))
+        task.add_done_callback(lambda _: self.inflight.pop(run_key, None))
+        return run
+
+    @staticmethod
+    def _spec(p, plan, entropy, opts):
+        """engine_spec() for a request; mode="joint" builds the funnel's wins PMF."""
+        N_new, tiers, gap_mrr, tol, iters = tier_inputs(p, plan)
+        spec_opts = {k: v for k, v in opts.items() if k not in ("mode", "funnel")}
+        if opts.get("mode") == "joint":
+            spec_opts["wins"] = wins_pmf(p, plan, rates=opts.get("funnel", "proposed"))
+        return engine_spec(opts.get("mode", "mc"), N_new, tiers, gap_mrr, tol, iters,
+                           entropy=entropy, **spec_opts)
+
+    async def _compute(self, run, spec, entropy, key, funnel):
+        # Same grid_start() / grid_store() / grid_result() path as tier_mix_monte_carlo(),
+        # so a result has the same shape whichever of the two computed (and cached) it.
+        # `spec` is a callable building it when that is slow (mode="joint").
+        loop = asyncio.get_running_loop()
+        try:
+            if callable(spec):
+                spec = await loop.run_in_executor(None, spec)
+            grid, todo, cell_spec = await loop.run_in_executor(None, grid_start, spec)
+            f1Vec, f2Vec, z = grid["f1Vec"], grid["f2Vec"], grid["z"]
+            rows = [[] for _ in f2Vec]
+            for cell in todo:
+                rows[cell[0]].append(cell)
+
+            async def row_done(j):
+                best = recommend(f1Vec, f2Vec[j:j + 1], z[j:j + 1], grid["mean_mrpu"][j:j + 1])
+                await run.add({"j": j, "row": z[j].copy(), "best": best})
+
+            for j, band in enumerate(rows):
+                if not band:  # settled by the vectorized normal / joint pass
+                    await row_done(j)
+            futures = [loop.run_in_executor(self.pool, _eval_band, (cell_spec, entropy, band))
+                       for band in rows if band]
+            for fut in asyncio.as_completed(futures):
+                band = await fut
+                grid_store(grid, band)
+                await row_done(band[0][0])
+        except Exception as exc:  # surface engine errors to every follower
+            await run.add({"done": True, "error": str(exc)}, final=True)
+            return
+
+        result = grid_result(grid, funnel)
+        run.result = result
+        if key:
+            self.cache.put(key, result)
+        await run.add({"done": True, "recommended": result["recommended"], "cached": False}, final=True)
+
+    async def tier_mix(self, body):
+        run = self.tier_run(body)
+        async for msg in run.messages():
+            if "error" in msg:
+                raise RuntimeError(msg["error"])
+        return run.result
+
+    async def handle(self, reader, writer):
+        try:
+            await self._handle(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass  # client went away; any run it started keeps going for the cache
+        finally:
+            writer.close()
+
+    async def _handle(self, reader, writer):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) < 2:
+            return
+        method, path = request_line[0].upper(), request_line[1].split("?")[0].rstrip("/")
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY:
+            return await self._respond(writer, 413, {"error": "request body too large"})
+        raw = await reader.readexactly(length) if length else b""
+
+        if method == "OPTIONS":
+            return await self._respond(writer, 204, None)
+        if method == "GET" and path == "/health":
+            return await self._respond(writer, 200, {
+                "ok": True, "workers": self.workers, "inflight": len(self.inflight),
+                "cache": self.cache.stats()})
+        if method != "POST" or path not in ("/plan", "/tier-mix", "/tier-mix/stream"):
+            return await self._respond(writer, 404, {"error": "no route for %s %s" % (method, path)})
+
+        try:
+            body = json.loads(raw or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("request body must be a JSON object")
+            if path == "/plan":
+                return await self._respond(writer, 200, self.plan(body))
+            if path == "/tier-mix":
+                return await self._respond(writer, 200, await self.tier_mix(body))
+            run = self.tier_run(body)
+        except (TypeError, ValueError) as exc:
+            return await self._respond(writer, 400, {"error": str(exc)})
+        except RuntimeError as exc:
+            return await self._respond(writer, 500, {"error": str(exc)})
+
+        await self._start(writer, 200, "application/x-ndjson")
+        async for msg in run.messages():
+            writer.write(_line(msg))
+            await writer.drain()
+
+    async def _start(self, writer, status, content_type):
+        # No Content-Length: the body ends when the connection closes
+        reason = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+                  413: "Payload Too Large", 500: "Internal Server Error"}[status]
+        lines = ["HTTP/1.1 %d %s" % (status, reason), "Content-Type: " + content_type,
+                 "Cache-Control: no-store", "Connection: close"]
+        lines += ["%s: %s" % kv for kv in CORS_HEADERS.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    async def _respond(self, writer, status, payload):
+        await self._start(writer, status, "application/json")
+        if payload is not None:
+            writer.write(_line(payload))
+        await writer.drain()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, cache=None):
+    service = ComputeService(workers, cache)
+    server = await asyncio.start_server(service.handle, host, port)
+    print("gapcalc service on http://%s:%d (%d workers)" % (host, port, service.workers), flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m gapcalc.service",
+                                     description="Serve computePlan / tierMixMonteCarlo over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--cache-dir", default=None, help="share results on disk (see gapcalc.cache)")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, ResultCache(args.cache_dir)))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+# Scenario sweeps: a lazy Cartesian product over any `defaults` keys, evaluated
+# chunk by chunk with compute_plan_batch (and optionally the tier-mix engine)
+# and streamed to chunk_NNNNN.npz files next to a sweep.json manifest.
+#
+# Only one chunk of scenarios is ever materialized. Chunks are written via a
+# temp file + rename, so an interrupted sweep resumes at the first missing chunk.
+#
+#   python -m gapcalc.sweep spec.json out_dir
+#   spec.json: {"axes": {"ICP_2026": [200, 300, 400], ...}, "base": {...},
+#               "chunk_size": 10000, "tier_mix": "exact"}
+
+import json
+import os
+import sys
+
+import numpy as np
+
+from .defaults import DEFAULTS
+from .plan_batch import compute_plan_batch
+from .tier_mix import tier_mix_monte_carlo
+
+MANIFEST = "sweep.json"
+TIER_FIELDS = ("N_new", "f1", "f2", "f3", "prob_gap", "mean_avg_mrpu")
+
+
+def _chunk_path(out_dir, k):
+    return os.path.join(out_dir, "chunk_%05d.npz" % k)
+
+
+def _manifest(axes, base, chunk_size, tier_mix, seed):
+    shape = [len(v) for v in axes.values()]
+    total = int(np.prod(shape)) if shape else 1
+    return {
+        "axes": {k: [float(x) for x in v] for k, v in axes.items()},
+        "base": base,
+        "chunk_size": chunk_size,
+        "tier_mix": tier_mix,
+        "seed": seed,
+        "total": total,
+        "n_chunks": -(-total // chunk_size),
+    }
+
+
+def _read_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            if json.load(f) != manifest:
+                raise ValueError("%s already holds a different sweep; use a new out_dir" % out_dir)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def chunk_columns(axes, base, start, stop):
+    """Input columns for scenarios [start, stop) of the product, in C order over `axes`."""
+    keys = list(axes)
+    values = [np.asarray(axes[k], dtype=float) for k in keys]
+    idx = np.arange(start, stop)
+    picks = np.unravel_index(idx, [len(v) for v in values]) if keys else ()
+    cols = {k: np.full(len(idx), float(v)) for k, v in base.items() if k not in axes}
+    for k, v, pick in zip(keys, values, picks):
+        cols[k] = v[pick]
+    return cols
+
+
+def _tier_columns(cols, plan, tier_mix, entropy, start, cache=None):
+    n = len(plan["gap_mrr"])
+    out = {name: np.full(n, np.nan) for name in TIER_FIELDS}
+    for r in range(n):
+        p = {k: float(v[r]) for k, v in cols.items()}
+        plan_r = {k: v[r].item() for k, v in plan.items()}
+        seed = int(np.random.SeedSequence(entropy, spawn_key=(start + r,)).generate_state(1)[0])
+        if cache is not None:
+            res = cache.tier_mix(p, plan_r, seed=seed, mode=tier_mix)
+        else:
+            res = tier_mix_monte_carlo(p, plan_r, seed=seed, mode=tier_mix)
+        out["N_new"][r] = res["N_new"]
+        if res["recommended"]:
+            for name in TIER_FIELDS[1:]:
+                out[name][r] = res["recommended"][name]
+    return out
+
+
+def run_sweep(axes, out_dir, base=None, chunk_size=10000, tier_mix=None, seed=None, cache=None):
+    """
+    Evaluate every combination of `axes` ({defaults key: list/range/array}) on top
+    of DEFAULTS updated with `base` and write columnar chunks under `out_dir`.
+
+    Each chunk holds the scenario index, the input columns as in_<key>, every
+    compute_plan output, and, when tier_mix is "mc" or "exact", the recommended
+    mix as tier_<field>. Re-running with the same arguments skips finished
+    chunks; without a `seed`, a tier-mix sweep resumes with the one its first
+    run generated. `cache` (a cache.ResultCache) reuses tier-mix results across
+    scenarios, runs and workers. Returns the manifest dict.
+    """
+    base = dict(DEFAULTS, **(base or {}))
+    unknown = sorted(set(axes) - set(base))
+    if unknown:
+        raise ValueError("sweep axes are not planner inputs: %s" % ", ".join(unknown))
+    axes = {k: list(v) for k, v in axes.items()}
+    if tier_mix is not None and seed is None:
+        # Resuming: reuse the seed the first run generated, so the manifests match
+        previous = _read_manifest(out_dir)
+        seed = previous.get("seed") if previous else None
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy % 2 ** 63)
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = _manifest(axes, base, chunk_size, tier_mix, seed)
+    _write_manifest(out_dir, manifest)
+
+    for k in range(manifest["n_chunks"]):
+        path = _chunk_path(out_dir, k)
+        if os.path.exists(path):
+            continue
+        start = k * chunk_size
+        stop = min(start + chunk_size, manifest["total"])
+        cols = chunk_columns(axes, base, start, stop)
+        plan = compute_plan_batch(cols)
+        data = {"scenario": np.arange(start, stop)}
+        data.update(("in_" + key, v) for key, v in cols.items())
+        data.update(plan)
+        if tier_mix is not None:
+            tiers = _tier_columns(cols, plan, tier_mix, seed, start, cache)
+            data.update(("tier_" + name, v) for name, v in tiers.items())
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, **data)
+        os.replace(tmp, path)
+    return manifest
+
+
+def iter_sweep(out_dir):
+    """Yield the finished chunks of a sweep as dicts of columns, in order."""
+    with open(os.path.join(out_dir, MANIFEST), encoding="utf-8") as f:
+        n_chunks = json.load(f)["n_chunks"]
+    for k in range(n_chunks):
+        path = _chunk_path(out_dir, k)
+        if not os.path.exists(path):
+            break
+        with np.load(path) as z:
+            yield {name: z[name] for name in z.files}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("usage: python -m gapcalc.sweep SPEC.json OUT_DIR")
+        return 2
+    with open(argv[0], encoding="utf-8") as f:
+        spec = json.load(f)
+    manifest = run_sweep(
+        spec["axes"], argv[1],
+        base=spec.get("base"),
+        chunk_size=spec.get("chunk_size", 10000),
+        tier_mix=spec.get("tier_mix"),
+        seed=spec.get("seed"),
+    )
+    print("Swept %d scenarios in %d chunks -> %s" % (manifest["total"], manifest["n_chunks"], argv[1]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
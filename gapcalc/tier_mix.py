@@ -0,0 +1,625 @@
+# Python tier-mix engine: the same simplex grid as tierMixMonteCarlo() in the
+# generated page, but with tier counts drawn as one multinomial batch per cell
+# instead of one randTier() call per simulated customer.
+#
+# mode="exact" replaces sampling with the multinomial PMF summed over the
+# (n1, n2) lattice points whose MRR total lands inside the tolerance band.
+#
+# mode="adaptive" samples each cell in batches until the Wilson interval on
+# prob_gap is narrower than `half_width`, capped at mc_tier_iterations draws.
+#
+# mode="normal" approximates the MRR total by a normal with an Edgeworth skew term
+# and a lattice continuity correction, in O(1) per cell whatever N_new is. Its
+# Berry-Esseen error bound is checked per cell; cells where it exceeds
+# `max_error` are recomputed exactly (or by MC for very large N_new).
+#
+# Every cell draws from its own RNG stream keyed by (seed, j, i), so with a fixed
+# `seed` a run gives identical results serially or split over `workers`. That is
+# the only equality guarantee: other samplers or modes, and unseeded runs, agree
+# only to within sampling error. sampler="crn" instead feeds every cell the same
+# (iterations x N_new) uniforms, so neighbouring cells differ by signal, not noise. "halton" / "sobol" share one
+# randomized 2-D point set and turn each point into the counts (n1, n2) by
+# inverse-CDF binomial draws, which is where low discrepancy actually pays off.
+#
+# mode="joint" stops fixing N_new at the required new customers: the number of
+# wins is the ICP_2026 funnel's (funnel.wins_pmf), and a cell's prob_gap is the
+# chance of landing in the tolerance band over both the wins and their tiers. It
+# is exact: Horner's rule on the compound PGF G_N(G_X(z)) over the MRR lattice,
+# truncated just above the band (one absorbing bin for everything beyond it).
+#
+# mrpu=[sketch per tier] (see empirical.py) bootstraps each new customer's MRPU
+# from the tier's empirical distribution instead of using tierK_mrpu.
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import warnings
+from statistics import NormalDist
+
+import numpy as np
+
+from .funnel import wins_pmf
+from .plan import js_round, safe_float
+from .timing import stage
+
+GRID_STEP = 0.05
+
+
+def simplex_axis(step=GRID_STEP):
+    """Fractions 0, step, ..., 1 rounded like the JS fVals loop."""
+    n = js_round(1.0 / step)
+    return np.round(np.arange(n + 1) / n, 2)
+
+
+def tier_inputs(p, plan):
+    """Shared inputs for every engine mode: N_new, tier MRPUs, gap MRR, tolerance, iterations."""
+    rnc = plan["required_new_customers"]
+    N_new = js_round(rnc) if np.isfinite(rnc) and rnc > 0 else 0
+
+    tiers = np.array([
+        safe_float(p.get("tier1_mrpu"), 0),
+        safe_float(p.get("tier2_mrpu"), 0),
+        safe_float(p.get("tier3_mrpu"), 0),
+    ])
+
+    tol = safe_float(p.get("gap_tolerance_pct"), 0.07)
+    tol = min(0.5, max(0.0, tol))
+    iters = max(1, js_round(safe_float(p.get("mc_tier_iterations"), 5000)))
+    return N_new, tiers, plan["gap_mrr"], tol, iters
+
+
+def grid_cells(f1Vec, f2Vec):
+    """Yield (j, i, f1, f2, f3) for every grid cell inside the simplex, f2-major like the JS."""
+    for j, f2 in enumerate(f2Vec):
+        for i, f1 in enumerate(f1Vec):
+            if f1 + f2 > 1.000001:
+                continue
+            yield j, i, float(f1), float(f2), max(0.0, 1.0 - float(f1) - float(f2))
+
+
+def gap_ok(totals, gap_mrr, tol):
+    if gap_mrr > 0:
+        return np.abs(totals - gap_mrr) <= tol * gap_mrr
+    return np.ones(np.shape(totals), dtype=bool)
+
+
+def recommend(f1Vec, f2Vec, z, mean_mrpu):
+    """Highest prob_gap, ties broken by mean_avg_mrpu, scanning cells in JS order."""
+    best = None
+    for j, i, f1, f2, f3 in grid_cells(f1Vec, f2Vec):
+        cand = {
+            "f1": f1, "f2": f2, "f3": f3,
+            "prob_gap": float(z[j, i]),
+            "mean_avg_mrpu": float(mean_mrpu[j, i]),
+        }
+        if (best is None
+                or cand["prob_gap"] > best["prob_gap"]
+                or (cand["prob_gap"] == best["prob_gap"]
+                    and cand["mean_avg_mrpu"] > best["mean_avg_mrpu"])):
+            best = cand
+    return best
+
+
+def wilson_half_width(hits, n, z):
+    """Half-width of the Wilson score interval for hits / n at normal quantile z."""
+    p = hits / n
+    return z / (1 + z * z / n) * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n))
+
+
+def _stderr(prob, n):
+    return math.sqrt(prob * (1 - prob) / n)
+
+
+def _empirical_cell(rng, N_new, tiers, sketches, gap_mrr, tol, iters, f1, f2, f3):
+    counts = rng.multinomial(N_new, [f1, f2, f3], size=iters)
+    totals = np.zeros(iters)
+    for k, sketch in enumerate(sketches):
+        n_k = counts[:, k]
+        if sketch is None:
+            totals += n_k * tiers[k]
+            continue
+        # Iteration r owns the next n_k[r] draws; sum them through a cumulative sum
+        ends = np.cumsum(n_k)
+        csum = np.concatenate([[0.0], np.cumsum(sketch.sample(rng, int(ends[-1])))])
+        totals += csum[ends] - csum[ends - n_k]
+    prob = float(gap_ok(totals, gap_mrr, tol).mean())
+    return prob, totals.mean() / N_new, _stderr(prob, iters), iters
+
+
+def _mc_cell(rng, N_new, tiers, gap_mrr, tol, iters, f1, f2, f3):
+    counts = rng.multinomial(N_new, [f1, f2, f3], size=iters)
+    totals = counts @ tiers
+    prob = float(gap_ok(totals, gap_mrr, tol).mean())
+    return prob, totals.mean() / N_new, _stderr(prob, iters), iters
+
+
+def sample_cell(rng, N_new, tiers, gap_mrr, tol, size, f1, f2, f3):
+    """Draw `size` iterations for one mix; returns (gap hits, sum of new MRR)."""
+    totals = rng.multinomial(N_new, [f1, f2, f3], size=size) @ tiers
+    return int(gap_ok(totals, gap_mrr, tol).sum()), float(totals.sum())
+
+
+def _adaptive_cell(rng, N_new, tiers, gap_mrr, tol, max_iters, opts, f1, f2, f3):
+    hits, n, mrr_sum = 0, 0, 0.0
+    while n < max_iters:
+        size = min(opts["batch"], max_iters - n)
+        h, m = sample_cell(rng, N_new, tiers, gap_mrr, tol, size, f1, f2, f3)
+        hits += h
+        mrr_sum += m
+        n += size
+        if wilson_half_width(hits, n, opts["z"]) <= opts["half_width"]:
+            break
+    prob = hits / n
+    return prob, mrr_sum / n / N_new, _stderr(prob, n), n
+
+
+def count_lattice(N_new):
+    """All (n1, n2, n3) with n1 + n2 + n3 = N_new, plus their log multinomial coefficients."""
+    n1, n2 = np.meshgrid(np.arange(N_new + 1), np.arange(N_new + 1), indexing="ij")
+    keep = (n1 + n2) <= N_new
+    n1, n2 = n1[keep], n2[keep]
+    n3 = N_new - n1 - n2
+    log_fact = np.array([math.lgamma(k + 1) for k in range(N_new + 1)])
+    log_coef = log_fact[N_new] - log_fact[n1] - log_fact[n2] - log_fact[n3]
+    return n1, n2, n3, log_coef
+
+
+def ok_lattice(N_new, tiers, gap_mrr, tol):
+    """The count_lattice() points whose MRR total closes the gap."""
+    n1, n2, n3, log_coef = count_lattice(N_new)
+    ok = gap_ok(n1 * tiers[0] + n2 * tiers[1] + n3 * tiers[2], gap_mrr, tol)
+    return n1[ok], n2[ok], n3[ok], log_coef[ok]
+
+
+def _n_log_f(n, f):
+    # n * log(f) with 0 * log(0) = 0
+    if f > 0:
+        return n * math.log(f)
+    return np.where(n == 0, 0.0, -np.inf)
+
+
+def lattice_pmf(lattice, f1, f2, f3):
+    """Multinomial probability of each lattice point for mix (f1, f2, f3)."""
+    n1, n2, n3, log_coef = lattice
+    return np.exp(log_coef + _n_log_f(n1, f1) + _n_log_f(n2, f2) + _n_log_f(n3, f3))
+
+
+def _exact_cell(lattice, tiers, f1, f2, f3):
+    prob = min(1.0, float(lattice_pmf(lattice, f1, f2, f3).sum()))
+    return prob, f1 * tiers[0] + f2 * tiers[1] + f3 * tiers[2], 0.0, 0
+
+
+# Berry-Esseen constants: uniform (Shevtsova 2011) and non-uniform (Paditz 1989)
+BE_UNIFORM = 0.4748
+BE_NONUNIFORM = 31.935
+# Largest N_new for which mode="normal" falls back to the O(N_new^2) exact lattice
+EXACT_MAX_N = 1500
+
+_erf = np.vectorize(math.erf, otypes=[float])
+
+
+def _norm_cdf(z):
+    return 0.5 * (1.0 + _erf(np.asarray(z) / math.sqrt(2.0)))
+
+
+def lattice_span(tiers):
+    """Spacing of the attainable MRR totals (gcd of tier differences), 0 if MRPUs are not integers."""
+    if not np.all(tiers == np.round(tiers)):
+        return 0.0
+    diffs = [int(abs(t - tiers[0])) for t in tiers[1:] if t != tiers[0]]
+    return float(math.gcd(*diffs)) if diffs else 0.0
+
+
+def normal_approx(N_new, tiers, gap_mrr, tol, F):
+    """
+    (prob_gap, error_bound) arrays for the mixes in F (n x 3), from the mean,
+    variance and skewness of the multinomial MRR total.
+
+    The estimate is Edgeworth-corrected and evaluated half a lattice step
+    outside the attainable totals nearest the band edges. The bound is
+    rigorous: Berry-Esseen (uniform / non-uniform, whichever is tighter) at
+    both edges for the plain normal, plus the size of the Edgeworth term.
+    """
+    F = np.atleast_2d(np.asarray(F, dtype=float))
+    if gap_mrr <= 0:
+        return np.ones(len(F)), np.zeros(len(F))
+    mu = F @ tiers
+    d = tiers[None, :] - mu[:, None]
+    var = (F * d ** 2).sum(axis=1)
+    k3 = (F * d ** 3).sum(axis=1)
+    rho = (F * np.abs(d) ** 3).sum(axis=1)
+    lo, hi = gap_mrr * (1 - tol), gap_mrr * (1 + tol)
+
+    h = lattice_span(tiers)
+    if h > 0:
+        base = N_new * tiers[0]
+        lo = base + h * np.ceil((lo - base) / h - 1e-9)
+        hi = base + h * np.floor((hi - base) / h + 1e-9)
+        empty = lo > hi
+        lo, hi = lo - h / 2, hi + h / 2
+    else:
+        empty = np.zeros(len(F), dtype=bool)
+
+    degenerate = var <= 1e-12 * np.maximum(1.0, mu * mu)
+    sd = np.sqrt(np.where(degenerate, 1.0, var * N_new))
+    za, zb = (lo - N_new * mu) / sd, (hi - N_new * mu) / sd
+    p_norm = _norm_cdf(zb) - _norm_cdf(za)
+    gamma = np.where(degenerate, 0.0, k3 / np.where(degenerate, 1.0, var) ** 1.5 / math.sqrt(N_new))
+    phi = lambda z: np.exp(-0.5 * z * z) / math.sqrt(2 * math.pi)
+    edge = -gamma / 6 * (phi(zb) * (zb * zb - 1) - phi(za) * (za * za - 1))
+
+    lyapunov = np.where(degenerate, 0.0, rho / np.where(degenerate, 1.0, var) ** 1.5 / math.sqrt(N_new))
+    be = lambda z: np.minimum(BE_UNIFORM, BE_NONUNIFORM / (1 + np.abs(z) ** 3)) * lyapunov
+    prob = np.clip(p_norm + edge, 0.0, 1.0)
+    bound = be(za) + be(zb) + np.abs(edge)
+
+    # Single-point distributions (one tier only, or equal MRPUs) are exact
+    point = gap_ok(N_new * mu, gap_mrr, tol).astype(float)
+    prob = np.where(degenerate, point, np.where(empty, 0.0, prob))
+    bound = np.where(degenerate | empty, 0.0, np.minimum(bound, 1.0))
+    return prob, bound
+
+
+def _normal_cell(rng, N_new, tiers, gap_mrr, tol, iters, opts, state, f1, f2, f3):
+    prob, bound = normal_approx(N_new, tiers, gap_mrr, tol, [[f1, f2, f3]])
+    if bound[0] <= opts["max_error"]:
+        return float(prob[0]), f1 * tiers[0] + f2 * tiers[1] + f3 * tiers[2], 0.0, 0
+    if opts["fallback"] == "exact":
+        if "lattice" not in state:
+            state["lattice"] = ok_lattice(N_new, tiers, gap_mrr, tol)
+        return _exact_cell(state["lattice"], tiers, f1, f2, f3)
+    return _mc_cell(rng, N_new, tiers, gap_mrr, tol, iters, f1, f2, f3)
+
+
+# Most MRR lattice steps up to the top of the mode="joint" band; coarser MRPUs are rounded
+JOINT_MAX_BINS = 4096
+# tier_mix_funnel input -> funnel rates the page's tier mix draws N_new from (0: fixed N_new)
+TIER_MIX_FUNNEL = {1: "proposed", 2: "present"}
+
+
+def joint_funnel(p):
+    """Funnel rates ("proposed" / "present") for the tier_mix_funnel input, None for fixed N_new."""
+    return TIER_MIX_FUNNEL.get(js_round(safe_float(p.get("tier_mix_funnel"), 0)))
+
+
+def joint_lattice(tiers, gap_mrr, tol, max_bins=JOINT_MAX_BINS):
+    """(step, tier MRPUs in steps, band low, band high in steps) for mode="joint"; step is in EUR."""
+    lo_mrr, hi_mrr = (1 - tol) * gap_mrr, (1 + tol) * gap_mrr
+    step = 0.0
+    if np.all(tiers == np.round(tiers)):
+        step = float(math.gcd(*[int(t) for t in tiers]))
+    if step <= 0 or hi_mrr > max_bins * step:
+        step = hi_mrr / max_bins
+    lo = max(0, math.ceil(lo_mrr / step - 1e-9))
+    hi = math.floor(hi_mrr / step + 1e-9)
+    return step, np.round(tiers / step).astype(np.int64), lo, hi
+
+
+def joint_prob(wins, units, lo, hi, F):
+    """P(lo <= total MRR steps <= hi) per mix row of F, for wins ~ `wins` (PMF over 0..N)."""
+    F = np.atleast_2d(F)
+    top = hi + 1  # absorbing: any total above the band
+    H = np.zeros((len(F), top + 1))
+    H[:, 0] = wins[-1]
+    for pn in wins[-2::-1]:
+        G = np.zeros_like(H)
+        for k, u in enumerate(units):
+            f = F[:, k:k + 1]
+            if u < top:
+                G[:, u:top] += f * H[:, :top - u]
+                G[:, top] += f[:, 0] * H[:, top - u:].sum(axis=1)
+            else:
+                G[:, top] += f[:, 0] * H.sum(axis=1)
+        G[:, 0] += pn
+        H = G
+    return np.minimum(1.0, H[:, lo:top].sum(axis=1))
+
+
+def _joint_cell(wins, lattice, tiers, f1, f2, f3):
+    _, units, lo, hi = lattice
+    prob = float(joint_prob(wins, units, lo, hi, [f1, f2, f3])[0])
+    return prob, f1 * tiers[0] + f2 * tiers[1] + f3 * tiers[2], 0.0, 0
+
+
+MODES = ("mc", "exact", "adaptive", "normal", "joint")
+SAMPLERS = ("pseudo", "crn", "halton", "sobol")
+
+
+def _primes(n):
+    out, k = [], 2
+    while len(out) < n:
+        if all(k % q for q in out if q * q <= k):
+            out.append(k)
+        k += 1
+    return out
+
+
+def halton(n, d, rng):
+    """n points of the d-dimensional Halton sequence with a random Cranley-Patterson shift."""
+    out = np.empty((n, d))
+    idx = np.arange(1, n + 1)
+    for k, base in enumerate(_primes(d)):
+        x = np.zeros(n)
+        f = 1.0
+        i = idx.copy()
+        while i.any():
+            f /= base
+            x += f * (i % base)
+            i //= base
+        out[:, k] = x
+    return (out + rng.random(d)) % 1.0
+
+
+def shared_uniforms(sampler, entropy, iters, N_new):
+    """
+    Points reused by every cell. "crn": (iters, N_new) uniforms, row = one
+    iteration, column = one customer. "halton" / "sobol": (iters, 2) randomized
+    low-discrepancy points, one per iteration, consumed by _qmc_cell().
+    """
+    rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(2 ** 31,)))
+    if sampler == "crn":
+        return rng.random((iters, N_new))
+    if sampler == "halton":
+        return halton(iters, 2, rng)
+    try:
+        from scipy.stats import qmc
+    except ImportError:
+        raise ImportError("sampler='sobol' needs scipy (pip install scipy); use 'halton' instead")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # balance warning when iters is not a power of two
+        return qmc.Sobol(d=2, scramble=True, seed=rng).random(iters)
+
+
+def _shared_cell(U, N_new, tiers, gap_mrr, tol, f1, f2, f3):
+    # Same thresholds as randTier(): u < f1 -> tier 1, u < f1 + f2 -> tier 2, else tier 3
+    n1 = (U < f1).sum(axis=1)
+    n12 = (U < f1 + f2).sum(axis=1)
+    totals = n1 * tiers[0] + (n12 - n1) * tiers[1] + (N_new - n12) * tiers[2]
+    prob = float(gap_ok(totals, gap_mrr, tol).mean())
+    return prob, totals.mean() / N_new, _stderr(prob, len(U)), len(U)
+
+
+def _binom_ppf(u, n, q, log_fact):
+    """Inverse CDF of Binomial(n, q) at uniforms u (smallest k with CDF(k) > u)."""
+    k = np.arange(n + 1)
+    log_pmf = log_fact[n] - log_fact[k] - log_fact[n - k] + _n_log_f(k, q) + _n_log_f(n - k, 1.0 - q)
+    cdf = np.cumsum(np.exp(log_pmf))
+    return np.minimum(np.searchsorted(cdf, u, side="right"), n)
+
+
+def _qmc_cell(P, log_fact, N_new, tiers, gap_mrr, tol, f1, f2, f3):
+    # The counts are a 2-D draw, so the point set only needs 2 dimensions (a Halton
+    # or Sobol set in N_new dimensions is no better than pseudo-random):
+    # n1 ~ Bin(N_new, f1), then n2 | n1 ~ Bin(N_new - n1, f2 / (1 - f1)).
+    n1 = _binom_ppf(P[:, 0], N_new, min(1.0, f1), log_fact)
+    q = min(1.0, f2 / (1.0 - f1)) if f1 < 1.0 else 0.0
+    rest = N_new - n1
+    n2 = np.empty_like(n1)
+    for m in np.unique(rest):
+        rows = rest == m
+        n2[rows] = _binom_ppf(P[rows, 1], m, q, log_fact)
+    totals = n1 * tiers[0] + n2 * tiers[1] + (rest - n2) * tiers[2]
+    prob = float(gap_ok(totals, gap_mrr, tol).mean())
+    return prob, totals.mean() / N_new, _stderr(prob, len(P)), len(P)
+
+
+def cell_rng(entropy, j, i):
+    """Independent generator for grid cell (j, i), spawned from the run's root seed."""
+    return np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(j, i)))
+
+
+def engine_spec(mode, N_new, tiers, gap_mrr, tol, iters,
+                half_width=0.02, batch=250, confidence=0.95, sampler="pseudo", entropy=None,
+                max_error=0.01, fallback="auto", mrpu=None, wins=None):
+    """Picklable description of one engine run, consumed by cell_evaluator()."""
+    if mode not in MODES:
+        raise ValueError("unknown tier-mix mode %r (expected one of %s)" % (mode, ", ".join(MODES)))
+    if sampler not in SAMPLERS:
+        raise ValueError("unknown sampler %r (expected one of %s)" % (sampler, ", ".join(SAMPLERS)))
+    if sampler != "pseudo" and mode != "mc":
+        raise ValueError("sampler=%r only applies to mode='mc'" % sampler)
+    if mrpu is not None and (mode != "mc" or sampler != "pseudo"):
+        raise ValueError("empirical mrpu sketches only apply to mode='mc' with sampler='pseudo'")
+    if mode == "joint" and wins is None:
+        raise ValueError("mode='joint' needs the wins distribution (funnel.wins_pmf)")
+    if wins is not None and mode != "joint":
+        raise ValueError("wins only applies to mode='joint'")
+    if fallback == "auto":
+        fallback = "exact" if N_new <= EXACT_MAX_N else "mc"
+    if fallback not in ("exact", "mc"):
+        raise ValueError("unknown fallback %r (expected auto, exact or mc)" % fallback)
+    opts = {"half_width": half_width, "batch": max(1, int(batch)),
+            "z": NormalDist().inv_cdf(0.5 + confidence / 2),
+            "sampler": sampler, "entropy": entropy,
+            "max_error": max_error, "fallback": fallback,
+            "mrpu": None if mrpu is None else list(mrpu),
+            "wins": None if wins is None else np.asarray(wins, dtype=float)}
+    return (mode, N_new, tiers, gap_mrr, tol, iters, opts)
+
+
+def cell_evaluator(spec):
+    """f(rng, f1, f2, f3) -> (prob_gap, mean_avg_mrpu, stderr, iterations) for `spec`."""
+    mode, N_new, tiers, gap_mrr, tol, iters, opts = spec
+    if mode == "exact":
+        lattice = ok_lattice(N_new, tiers, gap_mrr, tol)
+        return lambda rng, f1, f2, f3: _exact_cell(lattice, tiers, f1, f2, f3)
+    if mode == "joint":
+        lattice = joint_lattice(tiers, gap_mrr, tol)
+        return lambda rng, f1, f2, f3: _joint_cell(opts["wins"], lattice, tiers, f1, f2, f3)
+    if mode == "adaptive":
+        return lambda rng, f1, f2, f3: _adaptive_cell(
+            rng, N_new, tiers, gap_mrr, tol, iters, opts, f1, f2, f3)
+    if mode == "normal":
+        state = {}  # exact fallback lattice, built on first use
+        return lambda rng, f1, f2, f3: _normal_cell(
+            rng, N_new, tiers, gap_mrr, tol, iters, opts, state, f1, f2, f3)
+    if opts["mrpu"] is not None:
+        return lambda rng, f1, f2, f3: _empirical_cell(
+            rng, N_new, tiers, opts["mrpu"], gap_mrr, tol, iters, f1, f2, f3)
+    if opts["sampler"] == "crn":
+        U = shared_uniforms("crn", opts["entropy"], iters, N_new)
+        return lambda rng, f1, f2, f3: _shared_cell(U, N_new, tiers, gap_mrr, tol, f1, f2, f3)
+    if opts["sampler"] != "pseudo":
+        P = shared_uniforms(opts["sampler"], opts["entropy"], iters, N_new)
+        log_fact = np.array([math.lgamma(k + 1) for k in range(N_new + 1)])
+        return lambda rng, f1, f2, f3: _qmc_cell(P, log_fact, N_new, tiers, gap_mrr, tol, f1, f2, f3)
+    return lambda rng, f1, f2, f3: _mc_cell(rng, N_new, tiers, gap_mrr, tol, iters, f1, f2, f3)
+
+
+def _eval_band(task):
+    # Runs in a worker process for parallel runs, so it only takes picklable args.
+    spec, entropy, band = task
+    cell = cell_evaluator(spec)
+    out = []
+    for j, i, f1, f2, f3 in band:
+        deterministic = spec[0] in ("exact", "joint") or spec[6]["sampler"] != "pseudo"
+        rng = None if deterministic else cell_rng(entropy, j, i)
+        out.append((j, i) + tuple(cell(rng, f1, f2, f3)))
+    return out
+
+
+def _bands(cells, n):
+    return [cells[k * len(cells) // n:(k + 1) * len(cells) // n] for k in range(n)]
+
+
+def tier_mix_monte_carlo(p, plan, seed=None, mode="mc", workers=None,
+                         half_width=0.02, batch=250, confidence=0.95, sampler="pseudo",
+                         max_error=0.01, fallback="auto", mrpu=None, funnel="proposed"):
+    """
+    Tier-mix Monte Carlo over the (f1, f2) simplex grid.
+
+    Returns {recommended, heatmap: {f1Vec, f2Vec, z}, N_new, tolPct}, the same
+    structure as the browser's tierMixMonteCarlo(); z holds NaN outside the simplex.
+
+    mode="mc" samples mc_tier_iterations multinomial draws per cell.
+    mode="exact" computes prob_gap and mean_avg_mrpu in closed form over the
+    O(N_new^2) count lattice: no sampling noise, and seed/iterations are ignored.
+    mode="adaptive" draws `batch` iterations at a time per cell and stops once the
+    Wilson interval (at `confidence`) has half-width <= `half_width`, or after
+    mc_tier_iterations draws.
+    mode="normal" uses normal_approx() wherever its error bound is <= `max_error`
+    and recomputes the remaining cells with `fallback` ("exact", "mc", or "auto":
+    exact up to N_new = EXACT_MAX_N). The heatmap then also carries the per-cell
+    `error_bound` (0 for exact cells, the Wilson half-width for MC ones) and the
+    result a `fallback` count of recomputed cells.
+
+    mode="joint" draws the number of wins from the `funnel` ("proposed" or
+    "present" rates, see funnel.wins_pmf) instead of fixing N_new; prob_gap is
+    computed exactly over both. The result also carries
+    `wins` ({mean, pmf, funnel}) and the MRR lattice `resolution` in EUR.
+
+    The heatmap also carries per-cell `stderr` of prob_gap and the `iterations`
+    actually drawn (0 for exact and joint modes).
+
+    sampler (mode="mc" only): "pseudo" draws an independent multinomial stream per
+    cell; "crn" reuses one uniform stream for every cell (common random numbers)
+    at O(iterations x N_new) per cell; "halton" (shifted) / "sobol" (scrambled,
+    needs scipy) map one 2-D low-discrepancy point per iteration to the tier
+    counts by inverse-CDF binomial draws. The shared samplers give a smooth
+    heatmap and a stable recommendation at far fewer iterations; their values
+    differ from "pseudo" (and from each other) by sampling error, not exactly.
+
+    mrpu (mode="mc", sampler="pseudo"): a list with one empirical.MRPUSketch (or
+    None, meaning tierK_mrpu) per tier; each simulated customer's MRPU is then
+    bootstrapped from its tier's sketch.
+
+    workers > 1 splits the grid into contiguous bands of cells over a process
+    pool (workers <= 0 uses every core); with a fixed `seed` the results are
+    identical to a serial run. Unseeded runs draw fresh entropy every call.
+    """
+    if mode not in MODES:
+        raise ValueError("unknown tier-mix mode %r (expected one of %s)" % (mode, ", ".join(MODES)))
+    N_new, tiers, gap_mrr, tol, iters = tier_inputs(p, plan)
+    if N_new <= 0:
+        return {"recommended": None, "heatmap": None, "N_new": 0, "tolPct": 0}
+
+    entropy = np.random.SeedSequence(seed).entropy
+    with stage("tier_mix_monte_carlo", mode=mode, sampler=sampler, N_new=N_new) as info:
+        # The wins PMF and the vectorized normal / joint passes are most of those modes' cost
+        wins = wins_pmf(p, plan, rates=funnel) if mode == "joint" else None
+        spec = engine_spec(mode, N_new, tiers, gap_mrr, tol, iters, half_width, batch, confidence,
+                           sampler, entropy, max_error, fallback, mrpu, wins)
+        grid, todo, cell_spec = grid_start(spec)
+
+        n = 1 if workers is None else (workers if workers > 0 else os.cpu_count() or 1)
+        n = min(n, len(todo))
+        info.update(workers=n)
+        if n <= 1:
+            results = [_eval_band((cell_spec, entropy, todo))] if todo else []
+        else:
+            with ProcessPoolExecutor(max_workers=n) as pool:
+                results = pool.map(_eval_band, [(cell_spec, entropy, band) for band in _bands(todo, n)])
+
+        for band in results:
+            grid_store(grid, band)
+        info.update(cells=len(grid["cells"]), draws=int(grid["iterations"].sum()) * N_new)
+    return grid_result(grid, funnel)
+
+
+def grid_start(spec):
+    """
+    (grid, todo, cell_spec) for one run of `spec` over the simplex grid. The
+    normal and joint modes fill their cells in one vectorized pass; the cells
+    left in `todo` are evaluated with _eval_band((cell_spec, entropy, band)),
+    stored with grid_store(), and grid_result() then assembles the result.
+    """
+    mode, N_new, tiers, gap_mrr, tol, iters, opts = spec
+    f1Vec = simplex_axis()
+    f2Vec = simplex_axis()
+    z = np.full((len(f2Vec), len(f1Vec)), np.nan)
+    grid = {"spec": spec, "f1Vec": f1Vec, "f2Vec": f2Vec, "z": z,
+            "mean_mrpu": np.full_like(z, np.nan), "stderr": np.full_like(z, np.nan),
+            "iterations": np.zeros(z.shape, dtype=np.int64),
+            "cells": list(grid_cells(f1Vec, f2Vec))}
+    cells = grid["cells"]
+    if mode not in ("normal", "joint"):
+        return grid, cells, spec
+
+    jj, ii = [c[0] for c in cells], [c[1] for c in cells]
+    F = np.array([c[2:] for c in cells])
+    grid["mean_mrpu"][jj, ii], grid["stderr"][jj, ii] = F @ tiers, 0.0
+    if mode == "joint":
+        # Every cell in one array pass; cell_evaluator() does the same one cell at a time
+        _, units, lo, hi = joint_lattice(tiers, gap_mrr, tol)
+        z[jj, ii] = joint_prob(opts["wins"], units, lo, hi, F)
+        return grid, [], spec
+
+    # Only cells with a loose bound are recomputed, by the fallback method
+    z[jj, ii], bound = normal_approx(N_new, tiers, gap_mrr, tol, F)
+    loose = bound > opts["max_error"]
+    grid.update(bound=bound, loose=loose, cell_index=(jj, ii))
+    fallback_spec = (opts["fallback"],) + tuple(spec[1:6]) + (dict(opts, wins=None),)
+    return grid, [c for c, bad in zip(cells, loose) if bad], fallback_spec
+
+
+def grid_store(grid, band):
+    """Write one _eval_band() result into the grid arrays."""
+    for j, i, prob, mrpu, se, n_used in band:
+        grid["z"][j, i], grid["mean_mrpu"][j, i] = prob, mrpu
+        grid["stderr"][j, i], grid["iterations"][j, i] = se, n_used
+
+
+def grid_result(grid, funnel=None):
+    """The tier_mix_monte_carlo() result for a finished grid (`funnel` as passed to it)."""
+    mode, N_new, tiers, gap_mrr, tol, iters, opts = grid["spec"]
+    f1Vec, f2Vec, z = grid["f1Vec"], grid["f2Vec"], grid["z"]
+    result = {
+        "recommended": recommend(f1Vec, f2Vec, z, grid["mean_mrpu"]),
+        "heatmap": {"f1Vec": f1Vec, "f2Vec": f2Vec, "z": z,
+                    "stderr": grid["stderr"], "iterations": grid["iterations"]},
+        "N_new": N_new,
+        "tolPct": tol,
+    }
+    if mode == "normal":
+        jj, ii = grid["cell_index"]
+        bound, loose, method = grid["bound"].copy(), grid["loose"], opts["fallback"]
+        bound[loose] = 0.0 if method == "exact" else opts["z"] * grid["stderr"][jj, ii][loose]
+        error_bound = np.full_like(z, np.nan)
+        error_bound[jj, ii] = bound
+        result["heatmap"]["error_bound"] = error_bound
+        result["fallback"] = {"cells": int(loose.sum()), "method": method}
+    if mode == "joint":
+        wins = opts["wins"]
+        result["wins"] = {"mean": float(np.arange(len(wins)) @ wins), "pmf": wins, "funnel": funnel}
+        result["resolution"] = joint_lattice(tiers, gap_mrr, tol)[0]
+    return result
@@ -0,0 +1,96 @@
+# Stage timing for the Python engine. Instrumented code wraps its stages in
+# stage("name", **args); nothing is measured until a hook is installed:
+#
+#   from gapcalc import timing
+#   with timing.recording() as rec:
+#       render_planner(path="index.html")
+#   print(rec.summary())
+#   rec.dump("trace.json")          # open in chrome://tracing or Perfetto
+#
+# A hook is any callable hook(name, start, end, args) with perf_counter()
+# seconds; set_hook() installs one globally (None removes it). Stages may add
+# results to their args dict (cells, draws, ...) before they close.
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+_hook = None
+
+
+def set_hook(hook):
+    """Install `hook(name, start, end, args)` for every stage; returns the previous hook."""
+    global _hook
+    previous, _hook = _hook, hook
+    return previous
+
+
+@contextlib.contextmanager
+def _timed(name, args):
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        hook = _hook
+        if hook is not None:
+            hook(name, start, time.perf_counter(), args)
+
+
+def stage(name, **args):
+    """Context manager yielding the stage's args dict; a no-op while no hook is installed."""
+    if _hook is None:
+        return contextlib.nullcontext(args)
+    return _timed(name, args)
+
+
+class TraceRecorder:
+    """Hook that keeps every stage and exports a Chrome trace (complete "X" events)."""
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+
+    def __call__(self, name, start, end, args):
+        args = dict(args)
+        if "cells" in args and end > start:
+            args["cells_per_s"] = args["cells"] / (end - start)
+        with self._lock:
+            self.events.append((name, start, end, threading.get_ident(), args))
+
+    def summary(self):
+        """{name: {"count", "total_s", "max_s"}} over the recorded stages."""
+        out = {}
+        for name, start, end, _, _ in self.events:
+            s = out.setdefault(name, {"count": 0, "total_s": 0.0, "max_s": 0.0})
+            s["count"] += 1
+            s["total_s"] += end - start
+            s["max_s"] = max(s["max_s"], end - start)
+        return out
+
+    def chrome_trace(self):
+        origin = min((e[1] for e in self.events), default=0.0)
+        tids = {}
+        events = [{
+            "name": name, "cat": "gapcalc", "ph": "X", "pid": os.getpid(),
+            "tid": tids.setdefault(tid, len(tids) + 1),
+            "ts": round((start - origin) * 1e6), "dur": round((end - start) * 1e6),
+            "args": args,
+        } for name, start, end, tid, args in self.events]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, default=float)
+
+
+@contextlib.contextmanager
+def recording(recorder=None):
+    """Install a TraceRecorder (or `recorder`) for the duration of the block."""
+    recorder = TraceRecorder() if recorder is None else recorder
+    previous = set_hook(recorder)
+    try:
+        yield recorder
+    finally:
+        set_hook(previous)
@@ -0,0 +1,25 @@
+import numpy as np
+
+from gapcalc.cohort import project_arr
+from gapcalc.defaults import DEFAULTS
+
+
+def test_partial_columns_fill_from_defaults():
+    ndr = np.linspace(1.0, 1.3, 7)
+    res = project_arr({"ndr_target": ndr})
+    assert res["exit_arr"].shape == (7, 5)
+    assert np.all(res["exit_arr"] > 0)
+    # Higher NDR, more ARR every year
+    assert np.all(np.diff(res["exit_arr"], axis=0) > 0)
+    # The column matching DEFAULTS gives the DEFAULTS projection
+    full = project_arr(dict(DEFAULTS, ndr_target=ndr[3]))
+    np.testing.assert_allclose(res["exit_arr"][3], full["exit_arr"])
+
+
+def test_zero_lifetime_keeps_no_customers():
+    res = project_arr({"ideal_customer_lifetime_years": 0})
+    lasting = project_arr(DEFAULTS)
+    assert np.all(res["exit_arr"] < lasting["exit_arr"])
+    # Only the month's new wins are on the books at each month end
+    wins = res["customers"][0]
+    np.testing.assert_allclose(res["customers"], wins)
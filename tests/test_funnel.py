@@ -0,0 +1,25 @@
+import time
+import tracemalloc
+
+import numpy as np
+
+from gapcalc.defaults import DEFAULTS
+from gapcalc.funnel import wins_pmf
+from gapcalc.plan import compute_plan
+
+
+def test_wins_pmf_large_icp_bounded():
+    # Joint tier mode is the page default, so wins_pmf runs on ordinary inputs
+    p = dict(DEFAULTS, ICP_2026=50000)
+    plan = compute_plan(p)
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    pmf = wins_pmf(p, plan, rates="proposed")
+    seconds = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < 512 * 2 ** 20
+    assert seconds < 30
+    assert abs(pmf.sum() - 1) < 1e-9
+    mean = 50000 * plan["proposed_reach"] * plan["proposed_meet"] * plan["proposed_win"]
+    assert abs(np.arange(len(pmf)) @ pmf - mean) < 1e-6 * mean
@@ -0,0 +1,11 @@
+import pytest
+
+from gapcalc.defaults import DEFAULTS
+from gapcalc.regions import render_regions
+
+
+@pytest.mark.parametrize("names", [["a/b", "a b"], ["IN", "in"], ["index"], ["???"]])
+def test_clashing_page_filenames_raise(tmp_path, names):
+    with pytest.raises(ValueError):
+        render_regions([(name, "IN", dict(DEFAULTS)) for name in names], str(tmp_path / "out"))
+    assert not (tmp_path / "out").exists()